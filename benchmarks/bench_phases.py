@@ -0,0 +1,146 @@
+import argparse
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from layout import LayoutResolver
+from slides import SlideContext
+from converter import open_package, load_course, load_look, load_author_map, describe_course, render_pages
+from pptx_stream import save_deck
+from ecmg_synth import build_package
+
+# ⏱️ Temps et pic mémoire de chaque phase de la conversion, sur des modules
+# synthétiques de taille croissante (ou sur des zips réels passés en argument).
+# Les phases sont mesurées séparément : une régression se voit sur la bonne ligne.
+#
+#   python benchmarks/bench_phases.py                      # tailles 25 / 100 / 400 nodes
+#   python benchmarks/bench_phases.py module.zip --json r.json
+#
+# Deux passes par module : la première chronomètre, la seconde mesure le pic
+# tracemalloc (tracemalloc ralentit trop pour fausser les temps).
+
+SIZES = (25, 100, 400)
+PHASES = ("unzip", "parse", "index", "describe", "render", "save")
+
+
+def run_phases(data, phase_hook):
+    # phase_hook(name) est appelé au début de chaque phase et une fois à la fin (None).
+    # Chaque phase appelle l'étape correspondante du convertisseur ; le look est
+    # compilé à chaque passe (pas de LOOK_CACHE), comme pour le premier module d'un lot.
+    phase_hook("unzip")
+    package = open_package(io.BytesIO(data))
+
+    phase_hook("parse")
+    course = load_course(package)
+
+    phase_hook("index")
+    layout = LayoutResolver()
+    look = load_look(package, layout=layout, look_cache=None)
+    context = SlideContext.from_package(package, look, load_author_map(package), layout)
+
+    phase_hook("describe")
+    pages = list(describe_course(course, context))
+
+    phase_hook("render")
+    prs = render_pages(pages, look.title_style, package, look=look)
+
+    phase_hook("save")
+    buffer = io.BytesIO()
+    save_deck(prs, buffer)
+    phase_hook(None)
+    package.close()
+    return len(pages), len(buffer.getvalue())
+
+
+def time_phases(data):
+    timings = {}
+    current = [None, 0.0]
+
+    def hook(name):
+        now = time.perf_counter()
+        if current[0] is not None:
+            timings[current[0]] = now - current[1]
+        current[0], current[1] = name, now
+
+    slides, pptx_size = run_phases(data, hook)
+    return timings, slides, pptx_size
+
+
+def memory_phases(data):
+    peaks = {}
+    current = [None]
+
+    def hook(name):
+        if current[0] is not None:
+            peaks[current[0]] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.reset_peak()
+        current[0] = name
+
+    tracemalloc.start()
+    try:
+        run_phases(data, hook)
+    finally:
+        tracemalloc.stop()
+    return peaks
+
+
+def bench(label, data, repeat):
+    best = {}
+    for _ in range(repeat):
+        timings, slides, pptx_size = time_phases(data)
+        for phase, seconds in timings.items():
+            best[phase] = min(seconds, best.get(phase, seconds))
+    peaks = memory_phases(data)
+    return {
+        "module": label,
+        "zip_bytes": len(data),
+        "slides": slides,
+        "pptx_bytes": pptx_size,
+        "seconds": best,
+        "peak_bytes": peaks,
+    }
+
+
+def print_result(result):
+    print(f"\n{result['module']} : {result['zip_bytes'] / 1024:.0f} Ko, {result['slides']} slides, pptx {result['pptx_bytes'] / 1024:.0f} Ko")
+    print(f"  {'phase':<10} {'temps':>10} {'pic mémoire':>13}")
+    for phase in PHASES:
+        print(f"  {phase:<10} {result['seconds'][phase] * 1000:>8.1f}ms {result['peak_bytes'][phase] / 1024 / 1024:>10.1f} Mo")
+    print(f"  {'total':<10} {sum(result['seconds'].values()) * 1000:>8.1f}ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark par phase de la conversion ECMG -> PPTX.")
+    parser.add_argument("zips", nargs="*", help="Modules réels à mesurer (par défaut : modules synthétiques)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="Nombre de nodes des modules synthétiques")
+    parser.add_argument("--repeat", type=int, default=3, help="Meilleur temps sur N passes")
+    parser.add_argument("--json", help="Écrit les résultats en JSON (comparaison entre versions)")
+    args = parser.parse_args(argv)
+
+    if args.zips:
+        modules = []
+        for path in args.zips:
+            with open(path, "rb") as f:
+                modules.append((os.path.basename(path), f.read()))
+    else:
+        modules = [(f"synth-{n}", build_package(nodes=n, sections=max(1, n // 20), depth=2)) for n in args.sizes]
+
+    results = []
+    for label, data in modules:
+        result = bench(label, data, args.repeat)
+        print_result(result)
+        results.append(result)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
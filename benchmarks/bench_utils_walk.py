@@ -0,0 +1,81 @@
+import io
+import os
+import sys
+import time
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import parse_xml_to_slides, extract_slide_data, extract_title
+
+# ⏱️ utils.parse_xml_to_slides sur des cours synthétiques profondément imbriqués.
+# Le temps par node doit rester constant quand le nombre de nodes augmente.
+#
+#   python benchmarks/bench_utils_walk.py [--legacy]
+
+PAGE = (
+    '<metadata><title><![CDATA[Page {id}]]></title></metadata>'
+    '<page type="observe"><screen id="s{id}">'
+    '<text id="t{id}"><design left="10" top="20" width="300" height="40"/>'
+    '<content><![CDATA[<p><b>Texte</b> de la page {id}</p>]]></content></text>'
+    '</screen></page>'
+)
+
+
+def nested_course(chains, depth):
+    # `chains` branches de `depth` niveaux ; chaque niveau a une page et une feuille
+    parts = ['<course><metadata><title>Synthétique</title></metadata><root><nodes>']
+    counter = 0
+    for _ in range(chains):
+        for _ in range(depth):
+            counter += 1
+            parts.append(f'<node id="{counter}">' + PAGE.format(id=counter) + '<nodes>')
+            counter += 1
+            parts.append(f'<node id="{counter}">' + PAGE.format(id=counter) + '</node>')
+        parts.append('</nodes></node>' * depth)
+    parts.append('</nodes></root></course>')
+    return "".join(parts).encode("utf-8"), counter
+
+
+def legacy_parse(xml_file, media_dir):
+    # ancien algorithme : findall(".//node") puis findall(".//node") par node
+    root = ET.parse(xml_file).getroot()
+    course_structure = []
+    for node in root.findall(".//node"):
+        subnodes = node.findall(".//node")
+        if subnodes:
+            section = {"section": extract_title(node), "slides": []}
+            for sub in subnodes:
+                section["slides"].append(extract_slide_data(sub, media_dir))
+            course_structure.append(section)
+        else:
+            course_structure.append({"section": None, "slides": [extract_slide_data(node, media_dir)]})
+    return course_structure
+
+
+def bench(parse, data, repeat=3):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        structure = parse(io.BytesIO(data), ".")
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    slides = sum(len(group["slides"]) for group in structure)
+    return best, slides
+
+
+def main():
+    parsers = [("single-pass", parse_xml_to_slides)]
+    if "--legacy" in sys.argv:
+        parsers.append(("legacy", legacy_parse))
+
+    print(f"{'algorithme':<12} {'profondeur':>10} {'nodes':>7} {'slides':>7} {'temps':>9} {'µs/node':>9}")
+    for depth in (10, 20, 40, 80, 160):
+        data, node_count = nested_course(chains=4, depth=depth)
+        for name, parse in parsers:
+            elapsed, slides = bench(parse, data)
+            print(f"{name:<12} {depth:>10} {node_count:>7} {slides:>7} {elapsed * 1000:>7.1f}ms {elapsed / node_count * 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import io
+import os
+import re
+import sys
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from package import EcmgPackage
+from converter import read_course
+from ecmg_synth import build_package
+
+# 🔍 Lecture en flux (CourseStream) et lecture en arbre (CourseTree) doivent
+# produire exactement les mêmes pages, nodes de section compris. Vérifié sur des
+# modules synthétiques plus ou moins imbriqués ; code de sortie 1 au premier écart.
+#
+#   python benchmarks/check_stream.py
+
+CASES = (
+    {"nodes": 12, "sections": 0, "depth": 0},
+    {"nodes": 30, "sections": 3, "depth": 1},
+    {"nodes": 40, "sections": 2, "depth": 2},
+    {"nodes": 40, "sections": 2, "depth": 3},
+)
+
+# section avec une page propre placée avant, puis après ses sous-nodes
+SECTION_PAGE = '<page type="observe"><screen id="s{id}"/></page>'
+
+
+def read_pages(data, streaming):
+    with EcmgPackage(io.BytesIO(data)) as package:
+        _, _, pages = read_course(package, streaming=streaming, look_cache=None)
+        return [page.pack() for page in pages]
+
+
+def compare(name, data):
+    tree = read_pages(data, streaming=False)
+    stream = read_pages(data, streaming=True)
+    if tree == stream:
+        print(f"{name} : {len(tree)} pages identiques")
+        return True
+    for index, (a, b) in enumerate(zip(tree, stream)):
+        if a != b:
+            print(f"{name} : page {index} différente\n  arbre : {a!r}\n  flux  : {b!r}")
+            break
+    else:
+        print(f"{name} : {len(tree)} pages en arbre, {len(stream)} en flux")
+    return False
+
+
+SECTION_OPENING = re.compile(r'<node id="(\d+)"><metadata><title><!\[CDATA\[Section \d+\]\]></title></metadata>')
+
+
+def with_section_pages(data, after):
+    # ajoute une page propre à chaque node de section du module synthétique,
+    # avant ses sous-nodes ou juste après le </nodes> qui les ferme
+    source = zipfile.ZipFile(io.BytesIO(data))
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as out:
+        for info in source.infolist():
+            content = source.read(info)
+            if info.filename.endswith("course.xml"):
+                text = content.decode("utf-8")
+                for match in reversed(list(SECTION_OPENING.finditer(text))):
+                    pos = closing_nodes(text, match.end()) if after else match.end()
+                    text = text[:pos] + SECTION_PAGE.format(id=match.group(1)) + text[pos:]
+                content = text.encode("utf-8")
+            out.writestr(info, content)
+    return buffer.getvalue()
+
+
+def closing_nodes(text, pos):
+    # position qui suit le </nodes> fermant le premier <nodes> trouvé après `pos`
+    pos = text.index("<nodes>", pos) + len("<nodes>")
+    depth = 1
+    while depth:
+        next_open = text.find("<nodes>", pos)
+        next_close = text.find("</nodes>", pos)
+        if next_open != -1 and next_open < next_close:
+            depth, pos = depth + 1, next_open + len("<nodes>")
+        else:
+            depth, pos = depth - 1, next_close + len("</nodes>")
+    return pos
+
+
+def main():
+    ok = True
+    for case in CASES:
+        name = "nodes={nodes} sections={sections} depth={depth}".format(**case)
+        ok &= compare(name, build_package(**case))
+
+    ok &= compare("sections avec page propre", with_section_pages(build_package(nodes=30, sections=3, depth=2), after=False))
+
+    # page propre après les sous-nodes : refusée en flux, quelle que soit la taille des blocs lus
+    data = with_section_pages(build_package(nodes=30, sections=3, depth=2), after=True)
+    try:
+        read_pages(data, streaming=True)
+    except ValueError as e:
+        print(f"page propre après les sous-nodes : refusée en flux ({e})")
+    else:
+        print("page propre après les sous-nodes : acceptée en flux, attendu ValueError")
+        ok = False
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
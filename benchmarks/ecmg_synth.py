@@ -0,0 +1,216 @@
+import argparse
+import io
+import random
+import zipfile
+from xml.sax.saxutils import escape
+
+from PIL import Image
+
+# 🏭 Générateur de modules ECMG synthétiques (zip SCORM) pour les benchmarks.
+# Même structure que les exports réels : course.xml / look.xml / author.xml dans
+# un dossier du zip, médias à côté. Le contenu est déterministe (graine fixe).
+#
+#   python benchmarks/ecmg_synth.py synth.zip --nodes 200 --sections 10 --images 2
+
+DEFAULTS = {
+    "nodes": 50,         # pages de contenu (hors sections)
+    "sections": 5,       # nodes de section contenant des pages
+    "depth": 1,          # niveaux d'imbrication des sections
+    "images": 1,         # images par page
+    "texts": 2,          # blocs de texte par page
+    "consignes": 1,      # consignes par page
+    "items": 4,          # cartes / items Carousel / Vista par page interactive
+    "mcq": 5,            # pages QCM
+    "results": 1,        # pages bilan
+    "sounds": 1,         # sons par page
+    "image_size": 400,   # côté des images générées (px)
+    "media_files": 20,   # images distinctes dans le zip (réutilisées entre pages)
+}
+
+INTERACTIVE_TYPES = ("Cards", "Carousel", "Vista")
+
+LOOK_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<look>
+ <screen id="page_intro">
+  <image id="cadre_intro"><design top="100" left="50" width="600" height="300"/><content file="cadre_intro.png"/></image>
+  <text id="title_UA_intro"><design top="420" left="50" width="600" height="60" font="Tahoma" fontsize="30" fontcolor="#13ABB5" align="center" bold="1"/><content/></text>
+ </screen>
+ <title id="titre_activite"><design top="10" left="20" width="900" height="50" font="Tahoma" fontsize="25" fontcolor="#13ABB5" align="left" bold="1"/></title>
+ <text id="consigne"><design top="500" left="40" width="700" height="60" font="Arial" fontsize="20" align="center" valign="middle"/></text>
+ <image id="illu"><design top="120" left="500" width="300" height="250"/></image>
+ <text id="texte"><design top="120" left="40" width="420" height="200" font="Tahoma" fontsize="16" fontcolor="#3D3C3B"/></text>
+</look>
+"""
+
+
+def html(text):
+    # contenu HTML ECMG, échappé comme dans les exports (texte d'un élément XML)
+    return escape(f'<p align="left"><font face="Tahoma" size="18" color="#3D3C3B"><b>{text}</b> suite du paragraphe <i>en italique</i></font></p>')
+
+
+class CourseWriter:
+    def __init__(self, options, rng):
+        self.options = options
+        self.rng = rng
+        self.counter = 0
+        self.author = {}
+        self.media_names = [f"img_{i:03d}.png" for i in range(options["media_files"])]
+        self.sound_names = set()
+        self.intro_written = False
+
+    def next_id(self):
+        self.counter += 1
+        return self.counter
+
+    def author_id(self, text):
+        ref = f"#{len(self.author) + 1000}"
+        self.author[ref] = text
+        return ref
+
+    def design(self):
+        rng = self.rng
+        return f'<design left="{rng.uniform(5, 60):.3f}" top="{rng.uniform(5, 60):.3f}" width="{rng.uniform(30, 90):.3f}" height="{rng.uniform(10, 40):.3f}"/>'
+
+    def screen_elements(self, node_id):
+        o = self.options
+        parts = []
+        for i in range(o["consignes"]):
+            parts.append(f'<consigne id="consigne" author_id="{self.author_id("consigne")}"><design locked="1"/><content format="xhtml">{html(f"Consigne {node_id}.{i}")}</content></consigne>')
+        for i in range(o["images"]):
+            design = self.design() if i % 2 else '<design locked="1"/>'
+            parts.append(f'<image id="illu" author_id="{self.author_id("image")}">{design}<content file="{self.rng.choice(self.media_names)}"/></image>')
+        for i in range(o["texts"]):
+            design = self.design() if i % 2 else '<design locked="1"/>'
+            parts.append(f'<text id="texte" author_id="{self.author_id("texte")}">{design}<content format="xhtml">{html(f"Texte {node_id}.{i}")}</content></text>')
+        for i in range(o["sounds"]):
+            name = f"sound_{node_id}_{i}.mp3"
+            self.sound_names.add(name)
+            parts.append(f'<sound id="son" author_id="{self.author_id(f"Texte lu de la page {node_id}")}"><content file="{name}"/></sound>')
+        return parts
+
+    def interactive(self, kind, node_id):
+        n = self.options["items"]
+        if kind == "Cards":
+            cards = "".join(
+                f"<card><face>{html(f'Face {node_id}.{i}')}</face><back>{html(f'Dos {node_id}.{i}')}</back></card>"
+                for i in range(n)
+            )
+            return f'<elfe id="Cards"><content type="Cards"><cards>{cards}</cards></content></elfe>'
+        items = "".join(f"<item>{html(f'{kind} {node_id}.{i}')}</item>" for i in range(n))
+        return f'<elfe id="{kind}"><content type="{kind}"><items>{items}</items></content></elfe>'
+
+    def mcq_screen(self, node_id):
+        items = "".join(f'<item score="{100 if i == 0 else 0}">Réponse {i}</item>' for i in range(self.options["items"]))
+        return (
+            f'<elfe id="MCQText"><content type="MCQText"><items>{items}</items></content></elfe>'
+            f'<question id="question_activites"><content format="xhtml">{html(f"Question {node_id}")}</content></question>'
+        )
+
+    def page(self, node_id, kind):
+        title = f"<metadata><title><![CDATA[Page {node_id}]]></title></metadata>"
+        if kind == "result":
+            results = "".join(
+                f'<result score="{score}"><screen><text><content format="xhtml">{html(f"Bilan {score}")}</content></text></screen></result>'
+                for score in (0, 50, 100)
+            )
+            return f'{title}<page type="result"><results>{results}</results></page>'
+
+        elements = self.screen_elements(node_id)
+        page_type = "observe"
+        if kind == "mcq":
+            page_type = "eval"
+            elements.append(self.mcq_screen(node_id))
+            feedback = f'<feedbacks><correc><fb><screen><feedback><content>{html("Correction")}</content></feedback></screen></fb></correc></feedbacks>'
+        else:
+            feedback = ""
+            if kind in INTERACTIVE_TYPES:
+                page_type = "discover"
+                elements.append(self.interactive(kind, node_id))
+        # la première page reçoit les éléments d'intro du look
+        screen_id = f"screen_{node_id}" if self.intro_written else "page_intro"
+        self.intro_written = True
+        return f'{title}<page type="{page_type}"><screen id="{screen_id}">{"".join(elements)}</screen>{feedback}</page>'
+
+    def page_kinds(self):
+        o = self.options
+        kinds = ["mcq"] * o["mcq"] + ["result"] * o["results"]
+        rest = o["nodes"] - len(kinds)
+        kinds += [INTERACTIVE_TYPES[i % 3] if o["items"] and i % 4 == 3 else "content" for i in range(max(rest, 0))]
+        self.rng.shuffle(kinds)
+        return kinds[:o["nodes"]]
+
+    def nodes(self, kinds, depth):
+        # répartit les pages entre les sections, imbriquées sur `depth` niveaux
+        sections = max(self.options["sections"], 0)
+        if depth <= 0 or sections == 0:
+            return "".join(self.leaf(kind) for kind in kinds)
+        chunk = -(-len(kinds) // sections) if kinds else 0
+        parts = []
+        for start in range(0, len(kinds), chunk or 1):
+            node_id = self.next_id()
+            parts.append(
+                f'<node id="{node_id}"><metadata><title><![CDATA[Section {node_id}]]></title></metadata>'
+                f'<nodes>{self.nodes(kinds[start:start + chunk], depth - 1)}</nodes></node>'
+            )
+        return "".join(parts)
+
+    def leaf(self, kind):
+        node_id = self.next_id()
+        return f'<node id="{node_id}">{self.page(node_id, kind)}</node>'
+
+    def course_xml(self):
+        body = self.nodes(self.page_kinds(), self.options["depth"])
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>\n<course version="7.2.2.11">'
+            '<design flashplayer="10"><look><![CDATA[synth_look_v1]]></look></design>'
+            '<metadata><title><![CDATA[Module synthétique]]></title></metadata>'
+            f'<root><theme><nodes>{body}</nodes></theme></root></course>'
+        )
+
+    def author_xml(self):
+        items = "".join(f'<item id="{ref}"><description>{escape(text)}</description></item>' for ref, text in self.author.items())
+        return f'<?xml version="1.0" encoding="UTF-8"?>\n<author>{items}</author>'
+
+
+def png_bytes(rng, size):
+    # bruit + aplats : se compresse mal, comme une vraie illustration
+    im = Image.effect_noise((size, size), rng.randint(20, 80)).convert("RGB")
+    buffer = io.BytesIO()
+    im.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def build_package(seed=0, folder="module", **options):
+    options = {**DEFAULTS, **options}
+    rng = random.Random(seed)
+    writer = CourseWriter(options, rng)
+    course = writer.course_xml()
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(f"{folder}/course.xml", course)
+        zf.writestr(f"{folder}/look.xml", LOOK_XML)
+        zf.writestr(f"{folder}/author.xml", writer.author_xml())
+        for name in writer.media_names + ["cadre_intro.png"]:
+            zf.writestr(f"{folder}/{name}", png_bytes(rng, options["image_size"]), zipfile.ZIP_STORED)
+        for name in sorted(writer.sound_names):
+            zf.writestr(f"{folder}/{name}", rng.randbytes(2048), zipfile.ZIP_STORED)
+    return buffer.getvalue()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Génère un module ECMG synthétique (zip SCORM).")
+    parser.add_argument("output", help="Chemin du zip à écrire")
+    parser.add_argument("--seed", type=int, default=0)
+    for name, default in DEFAULTS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", dest=name, type=int, default=default)
+    args = vars(parser.parse_args(argv))
+    output = args.pop("output")
+    data = build_package(**args)
+    with open(output, "wb") as f:
+        f.write(data)
+    print(f"{output} : {len(data) / 1024:.0f} Ko")
+
+
+if __name__ == "__main__":
+    main()
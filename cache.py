@@ -0,0 +1,78 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+# 🗃️ Cache des conversions : clé = hash du zip + options du convertisseur
+# Incrémenter CACHE_VERSION quand le rendu change, pour invalider le cache disque.
+CACHE_VERSION = 6
+
+
+def cache_key(data, options=None):
+    h = hashlib.sha256()
+    h.update(f"v{CACHE_VERSION}".encode())
+    h.update(json.dumps(options or {}, sort_keys=True, default=str).encode())
+    h.update(data)
+    return h.hexdigest()
+
+class ConversionCache:
+    def __init__(self, max_entries=16, disk_dir=None):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        entry = self._read_disk(key)
+        if entry is not None:
+            self._remember(key, entry)
+        return entry
+
+    def put(self, key, pptx_bytes, warnings=(), stats=None):
+        entry = (pptx_bytes, list(warnings), dict(stats or {}))
+        self._remember(key, entry)
+        self._write_disk(key, entry)
+        return entry
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _paths(self, key):
+        return os.path.join(self.disk_dir, key + ".pptx"), os.path.join(self.disk_dir, key + ".json")
+
+    def _read_disk(self, key):
+        if not self.disk_dir:
+            return None
+        pptx_path, meta_path = self._paths(key)
+        try:
+            with open(pptx_path, "rb") as f:
+                pptx_bytes = f.read()
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return pptx_bytes, meta.get("warnings", []), meta.get("stats", {})
+
+    def _write_disk(self, key, entry):
+        if not self.disk_dir:
+            return
+        pptx_path, meta_path = self._paths(key)
+        pptx_bytes, warnings, stats = entry
+        meta = json.dumps({"warnings": warnings, "stats": stats})
+        # écriture atomique : un lecteur concurrent ne voit jamais un fichier partiel
+        for path, data, mode in ((pptx_path, pptx_bytes, "wb"), (meta_path, meta, "w")):
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, mode) as f:
+                f.write(data)
+            os.replace(tmp_path, path)
@@ -0,0 +1,169 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from converter import convert, parse_module, render_course
+from cache import cache_key
+from ir import Course
+from incremental import PageStore, store_path_for
+from profiling import Profiler, timed
+from media_store import MediaStore
+from pptx_stream import save_deck
+from layout import CALIBRATIONS, DEFAULT_CALIBRATION
+
+# 📦 Conversion en lot de modules ECMG (zips SCORM) en PowerPoint
+#
+#   python cli.py modules/ -o sorties/ -j 8
+#   python cli.py "exports/*.zip"
+#   python cli.py modules/ --ir-dir .ecir --slide-size 13.33x7.5   (re-rendu sans relire les zips)
+#   python cli.py modules/ -o sorties/ --incremental   (seules les pages modifiées sont redécrites)
+#   python cli.py module.zip --profile profil.json     (temps par phase, page et élément)
+#   python cli.py gros_cours.zip --stream --stream-output   (mémoire bornée à une slide)
+#   python cli.py lot/ --image-dpi 150 --media-store ~/.ecmg-media   (médias communs traités une fois)
+
+
+def collect_zips(inputs):
+    zips = []
+    for item in inputs:
+        if os.path.isdir(item):
+            matches = glob.glob(os.path.join(item, "*.zip"))
+        else:
+            matches = glob.glob(item)
+        for path in sorted(matches):
+            if path.lower().endswith(".zip") and path not in zips:
+                zips.append(path)
+    return zips
+
+def output_path_for(zip_path, output_dir):
+    name = os.path.splitext(os.path.basename(zip_path))[0] + ".pptx"
+    return os.path.join(output_dir or os.path.dirname(zip_path), name)
+
+def parse_slide_size(value):
+    width, height = value.lower().split("x")
+    return float(width), float(height)
+
+def load_or_parse(zip_path, ir_dir, streaming=False, slide_workers=None, calibration=None):
+    # IR rangée par empreinte du zip et profil de calibration : un module inchangé n'est lu qu'une fois
+    with open(zip_path, "rb") as f:
+        ir_path = os.path.join(ir_dir, cache_key(f.read(), {"calibration": calibration or DEFAULT_CALIBRATION}) + ".ecir")
+    if os.path.exists(ir_path):
+        try:
+            course = Course.load(ir_path)
+        except ValueError:
+            pass
+        else:
+            # même contenu : les sons et vidéos sont relus dans ce zip-ci
+            course.source = os.path.abspath(zip_path)
+            return course
+    course = parse_module(zip_path, [], streaming, slide_workers, calibration)
+    tmp_path = f"{ir_path}.{os.getpid()}.tmp"
+    course.save(tmp_path)
+    os.replace(tmp_path, ir_path)
+    return course
+
+# ⚙️ Exécuté dans un process du pool : on ne renvoie que des données picklables
+def convert_one(zip_path, output_path, image_dpi=None, streaming=False, slide_workers=None, ir_dir=None, slide_size=None, incremental=False, profile=False, stream_output=False, media_store_dir=None, calibration=None):
+    started = time.perf_counter()
+    warnings = []
+    stats = {}
+    result = {"module": os.path.basename(zip_path), "output": output_path, "slides": 0, "warnings": warnings, "stats": stats, "error": None}
+    profiler = Profiler() if profile else None
+    # sortie écrite slide par slide pendant le rendu, plus de prs.save final
+    output = output_path if stream_output else None
+    media_store = MediaStore(media_store_dir) if media_store_dir else None
+    try:
+        store = None
+        if ir_dir:
+            course = load_or_parse(zip_path, ir_dir, streaming, slide_workers, calibration)
+            prs = render_course(course, warnings, image_dpi, stats, slide_size, profiler=profiler, output=output, media_store=media_store)
+        else:
+            # pages de la conversion précédente, rangées à côté du .pptx
+            store = PageStore.load(store_path_for(output_path)) if incremental else None
+            prs = convert(zip_path, warnings, image_dpi, stats, streaming, slide_workers, slide_size, store=store, profiler=profiler, output=output, media_store=media_store, calibration=calibration)
+        if output is None:
+            with timed(profiler, "save"):
+                save_deck(prs, output_path)
+        if store is not None:
+            store.save(store_path_for(output_path))
+        result["slides"] = len(prs.slides)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+        if output is not None and os.path.exists(output):
+            os.remove(output)  # pptx partiel
+    result["seconds"] = time.perf_counter() - started
+    if media_store is not None:
+        stats["media_store_hits"] = media_store.hits
+        stats["media_store_misses"] = media_store.misses
+    if profiler is not None:
+        result["profile"] = profiler.report()
+    return result
+
+def print_summary(result):
+    status = "ERREUR" if result["error"] else "OK"
+    print(f"{status:<6} {result['module']:<40} {result['seconds']:>7.2f}s {result['slides']:>4} slides {len(result['warnings']):>3} avertissements")
+    if "image_bytes_before" in result["stats"]:
+        saved = result["stats"]["image_bytes_before"] - result["stats"]["image_bytes_after"]
+        print(f"         🗜️ images : {saved / 1024:.0f} Ko économisés")
+    if "media_store_hits" in result["stats"]:
+        print(f"         🗄️ stock de médias : {result['stats']['media_store_hits']} réutilisés, {result['stats']['media_store_misses']} nouveaux")
+    if "pages_reused" in result["stats"]:
+        print(f"         ♻️ pages : {result['stats']['pages_reused']} reprises, {result['stats']['pages_rebuilt']} reconstruites")
+    for message in result["warnings"]:
+        print(f"         ⚠️ {message}")
+    if result["error"]:
+        print(f"         ❌ {result['error']}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convertit des modules ECMG (zip SCORM) en PowerPoint.")
+    parser.add_argument("inputs", nargs="+", help="Dossiers ou motifs glob de fichiers zip")
+    parser.add_argument("-o", "--output-dir", help="Dossier de sortie (par défaut : à côté de chaque zip)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="Nombre de process de conversion")
+    parser.add_argument("--image-dpi", type=int, help="Réduit et réencode les images à cette résolution d'affichage")
+    parser.add_argument("--stream", action="store_true", help="Lit course.xml en flux (iterparse), mémoire constante")
+    parser.add_argument("--slide-workers", type=int, help="Process dédiés à la description des slides de chaque module (gros cours)")
+    parser.add_argument("--slide-size", type=parse_slide_size, help="Taille des slides en pouces, ex. 13.33x7.5 (par défaut 12x7.3)")
+    parser.add_argument("--calibration", choices=sorted(CALIBRATIONS), default=DEFAULT_CALIBRATION, help=f"Profil de conversion des coordonnées ECMG en pouces (défaut : {DEFAULT_CALIBRATION})")
+    parser.add_argument("--ir-dir", help="Dossier des représentations intermédiaires (.ecir) réutilisées entre deux rendus")
+    parser.add_argument("--incremental", action="store_true", help="Ne redécrit que les pages modifiées depuis la conversion précédente (fichier .pages à côté du .pptx)")
+    parser.add_argument("--stream-output", action="store_true", help="Écrit le pptx slide par slide pendant la conversion (gros cours, médias lourds)")
+    parser.add_argument("--media-store", metavar="DOSSIER", help="Stock persistant des tailles et images optimisées, partagé entre modules et exécutions")
+    parser.add_argument("--media-store-size", type=int, default=512, help="Taille maximale du stock de médias en Mo (défaut : 512)")
+    parser.add_argument("--profile", metavar="FICHIER", help="Écrit un rapport JSON des temps par phase, page et élément de chaque module")
+    args = parser.parse_args(argv)
+
+    zips = collect_zips(args.inputs)
+    if not zips:
+        print("Aucun fichier zip trouvé.", file=sys.stderr)
+        return 1
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+    if args.ir_dir:
+        os.makedirs(args.ir_dir, exist_ok=True)
+
+    started = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=max(1, args.jobs or 1)) as pool:
+        futures = [pool.submit(convert_one, path, output_path_for(path, args.output_dir), args.image_dpi, args.stream, args.slide_workers, args.ir_dir, args.slide_size, args.incremental, bool(args.profile), args.stream_output, args.media_store, args.calibration) for path in zips]
+        for future in as_completed(futures):
+            result = future.result()
+            print_summary(result)
+            results.append(result)
+
+    if args.media_store:
+        MediaStore(args.media_store, args.media_store_size * 1024 * 1024).evict()
+
+    if args.profile:
+        with open(args.profile, "w", encoding="utf-8") as f:
+            json.dump({r["module"]: r["profile"] for r in results}, f, ensure_ascii=False, indent=2)
+
+    failed = sum(1 for r in results if r["error"])
+    total_slides = sum(r["slides"] for r in results)
+    print(f"\n{len(results) - failed}/{len(results)} modules convertis, {total_slides} slides en {time.perf_counter() - started:.2f}s")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
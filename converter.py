@@ -0,0 +1,231 @@
+import io
+import os
+from collections import deque
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from xml.etree import ElementTree as ET
+from package import EcmgPackage
+from media import MediaRegistry
+from look import CompiledLook, LOOK_CACHE
+from layout import LayoutResolver
+from course import CourseTree, CourseStream, read_look_name, node_content
+from slides import SlideContext, describe_node, describe_node_xml, init_worker
+from render import render_slide
+from deck import base_deck
+from ir import Course
+from incremental import node_fingerprint
+from profiling import timed
+from pptx_stream import StreamingDeckWriter
+
+
+# 🧩 Descriptions des slides dans l'ordre des nodes, en parallèle si workers > 1.
+# Avec un PageStore, les nodes inchangés depuis la conversion précédente sont repris tels quels.
+def describe_course(course, context, workers=None, store=None, profiler=None):
+    pool = None
+    if workers and workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(context,))
+    try:
+        pending = deque()
+        for node in course:
+            node = node_content(node)
+            fingerprint = page = None
+            node_xml = ET.tostring(node) if pool is not None or store is not None else None
+            if store is not None:
+                fingerprint = node_fingerprint(node, node_xml, context, course.ua_title)
+                page = store.get(fingerprint)
+            built = page is None
+            seconds = 0.0
+            if built and pool is not None:
+                page = pool.submit(describe_node_xml, node_xml, course.ua_title, profiler is not None)
+            elif built and profiler is not None:
+                started = time.perf_counter()
+                page = describe_node(node, context, course.ua_title, profiler)
+                seconds = time.perf_counter() - started
+            elif built:
+                page = describe_node(node, context, course.ua_title)
+            pending.append((fingerprint, page, built, seconds))
+            # fenêtre bornée : le flux de nodes n'est pas chargé d'un coup en mémoire
+            while pending and (pool is None or len(pending) >= workers * 4):
+                yield finish_page(pending.popleft(), store, profiler)
+        while pending:
+            yield finish_page(pending.popleft(), store, profiler)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+# 📶 progress(faites, total) appelé à chaque page remise au rendu ; total vaut None
+# en lecture en flux (nombre de nodes inconnu d'avance)
+def report_progress(pages, progress, total):
+    for done, page in enumerate(pages, 1):
+        progress(done, total)
+        yield page
+
+def finish_page(item, store, profiler=None):
+    fingerprint, page, built, seconds = item
+    if isinstance(page, Future):
+        page = page.result()
+        if profiler is not None:
+            page, dumped = page
+            seconds = dumped[0]["describe"][0]
+            profiler.merge(dumped)
+    elif built and profiler is not None:
+        profiler.add_phase("describe", seconds)
+    if built and store is not None:
+        store.put(fingerprint, page)
+    if profiler is not None:
+        profiler.page_described(page, seconds)
+    return page
+
+# Étapes de read_course, réutilisables séparément (benchmarks/bench_phases.py)
+def load_course(package, streaming=False):
+    return CourseStream(package.open_course()) if streaming else CourseTree(package.open_course())
+
+def load_look(package, warnings=None, layout=None, look_cache=LOOK_CACHE, look_name=None):
+    # look_name : nom du look cité par course.xml, relu en tête du fichier s'il n'est pas donné
+    with package.open_look() as f:
+        look_data = f.read()
+    if look_cache is None:
+        return CompiledLook.parse(io.BytesIO(look_data), warnings, layout)
+    if look_name is None:
+        with package.open_course() as f:
+            look_name = read_look_name(f)
+    return look_cache.get(look_name, look_data, warnings, layout)
+
+def load_author_map(package):
+    author_root = ET.parse(package.open_author()).getroot()
+    return {
+        el.attrib.get("id"): el.findtext("description")
+        for el in author_root.findall(".//item")
+    }
+
+def read_course(package, warnings=None, streaming=False, workers=None, store=None, profiler=None, progress=None, calibration=None, look_cache=LOOK_CACHE):
+    # -> (CourseTree ou CourseStream, look.CompiledLook, itérateur de ir.Page dans l'ordre des nodes)
+    # en flux, course.ua_title n'est connu qu'une fois les pages parcourues
+    # calibration : profil de layout.CALIBRATIONS (nom) ou layout.Calibration
+    # look_cache : looks compilés réutilisés d'un module à l'autre (None : look relu)
+    if warnings is None:
+        warnings = []
+
+    with timed(profiler, "parse"):
+        course = load_course(package, streaming)
+
+    layout = LayoutResolver(calibration)
+    with timed(profiler, "look"):
+        # en flux, le nom du look est lu en tête d'une seconde ouverture de course.xml
+        look_name = course.look_name if isinstance(course, CourseTree) else None
+        look = load_look(package, warnings, layout, look_cache, look_name)
+
+    with timed(profiler, "author"):
+        author_map = load_author_map(package)
+
+    context = SlideContext.from_package(package, look, author_map, layout)
+    pages = describe_course(course, context, workers, store, profiler)
+    if progress is not None:
+        pages = report_progress(pages, progress, len(course.nodes) if isinstance(course, CourseTree) else None)
+    return course, look, pages
+
+def render_pages(pages, title_style, media_source, warnings=None, image_dpi=None, stats=None, slide_size=None, template=None, profiler=None, output=None, media_store=None, look=None):
+    # media_source : EcmgPackage ou ir.Course, tout ce qui a un open_member(member)
+    # output : si donné, le pptx y est écrit slide par slide (mémoire bornée à une slide) ;
+    # la Presentation renvoyée est alors vidée et ne doit pas être sauvegardée à nouveau.
+    if warnings is None:
+        warnings = []
+
+    # deck de base (taille, style du titre) préparé une fois par look et par process
+    base = base_deck(template, slide_size, title_style)
+    prs, layout = base.clone()
+    scale = base.scale
+    media = MediaRegistry(media_source, media_store, look)
+    writer = StreamingDeckWriter(output, media, image_dpi) if output is not None else None
+
+    try:
+        for page in pages:
+            if profiler is None:
+                slide = render_slide(prs, layout, page, media, warnings, scale)
+            else:
+                started = time.perf_counter()
+                slide = render_slide(prs, layout, page, media, warnings, scale, profiler)
+                profiler.page_rendered(time.perf_counter() - started)
+            if writer is not None:
+                with timed(profiler, "save"):
+                    writer.slide_done(slide)
+    except BaseException:
+        if writer is not None:
+            writer.abort()
+        raise
+
+    if writer is not None:
+        with timed(profiler, "save"):
+            writer.close(prs)
+        if image_dpi and stats is not None:
+            stats["image_bytes_before"] = writer.image_bytes_before
+            stats["image_bytes_after"] = writer.image_bytes_after
+        return prs
+
+    # 🗜️ Optionnel : images réduites à leur taille d'affichage et réencodées
+    if image_dpi:
+        with timed(profiler, "images"):
+            before, after = media.optimize_images(image_dpi)
+        if stats is not None:
+            stats["image_bytes_before"] = before
+            stats["image_bytes_after"] = after
+
+    return prs
+
+def build_presentation(package, warnings=None, image_dpi=None, stats=None, streaming=False, workers=None, slide_size=None, template=None, store=None, profiler=None, output=None, media_store=None, progress=None, calibration=None):
+    if warnings is None:
+        warnings = []
+    _, look, pages = read_course(package, warnings, streaming, workers, store, profiler, progress, calibration)
+    prs = render_pages(pages, look.title_style, package, warnings, image_dpi, stats, slide_size, template, profiler, output, media_store, look)
+    if store is not None and stats is not None:
+        stats["pages_reused"] = store.reused
+        stats["pages_rebuilt"] = store.rebuilt
+    return prs
+
+def open_package(source):
+    # source : chemin du zip ou objet fichier (BytesIO de l'upload, sans passer par le disque)
+    package = EcmgPackage(source)
+    if not package.is_complete:
+        package.close()
+        raise FileNotFoundError("Fichiers course.xml, look.xml ou author.xml introuvables.")
+    return package
+
+# 🚀 Conversion complète d'un module ECMG (zip SCORM) en Presentation python-pptx
+def convert(source, warnings=None, image_dpi=None, stats=None, streaming=False, workers=None, slide_size=None, template=None, store=None, profiler=None, output=None, media_store=None, progress=None, calibration=None):
+    with timed(profiler, "unzip"):
+        package = open_package(source)
+    with package:
+        return build_presentation(package, warnings, image_dpi, stats, streaming, workers, slide_size, template, store, profiler, output, media_store, progress, calibration)
+
+# 🔥 Look d'un module compilé et son deck de base préparé, sans lire les pages :
+# les conversions suivantes de ce look, dans ce process, partent du cache.
+def preload_look(source, calibration=None, look_cache=LOOK_CACHE):
+    with open_package(source) as package:
+        look = load_look(package, None, LayoutResolver(calibration), look_cache)
+    base_deck(title_style=look.title_style)
+
+# 🧱 Lecture seule : le module devient un ir.Course (pages + images référencées),
+# à sauvegarder avec Course.save et à re-rendre avec render_course sans relire les
+# XML. Les sons et vidéos restent dans le zip, relu au rendu : source doit alors
+# être un chemin.
+def parse_module(source, warnings=None, streaming=False, workers=None, calibration=None):
+    if warnings is None:
+        warnings = []
+    with open_package(source) as package:
+        reader, look, pages = read_course(package, warnings, streaming, workers, calibration=calibration)
+        pages = list(pages)
+        source_path = os.path.abspath(source) if isinstance(source, (str, os.PathLike)) else None
+        course = Course(reader.ua_title, look.title_style, pages, warnings=list(warnings), source=source_path)
+        for member in course.referenced_members():
+            with package.open_member(member) as f:
+                course.media[member] = f.read()
+    return course
+
+def render_course(course, warnings=None, image_dpi=None, stats=None, slide_size=None, template=None, profiler=None, output=None, media_store=None):
+    if warnings is None:
+        warnings = []
+    warnings.extend(course.warnings)
+    if profiler is not None:
+        for page in course.pages:
+            profiler.page_described(page, 0.0)
+    return render_pages(course.pages, course.title_style, course, warnings, image_dpi, stats, slide_size, template, profiler, output, media_store)
@@ -0,0 +1,111 @@
+from xml.etree import ElementTree as ET
+
+# 📖 Lecture de course.xml : arbre complet (CourseTree) ou flux (CourseStream).
+# Les deux exposent ua_title et s'itèrent sur les <node> dans l'ordre du document.
+DEFAULT_UA_TITLE = "[Titre UA manquant]"
+
+
+def read_ua_title(metadata):
+    # Lecture du titre global de l'UA (Unité d'Apprentissage)
+    if metadata is not None:
+        global_title_el = metadata.find("title")
+        if global_title_el is not None and global_title_el.text:
+            return global_title_el.text.strip()
+    return DEFAULT_UA_TITLE
+
+def read_look_name(source):
+    # nom du look (<design><look>) lu en tête de course.xml, sans aller jusqu'aux nodes
+    for event, el in ET.iterparse(source, events=("start", "end")):
+        if event == "start" and el.tag == "node":
+            break
+        if event == "end" and el.tag == "look":
+            return (el.text or "").strip() or None
+    return None
+
+def node_content(node):
+    # le node sans ses sous-nodes ni le texte qui le suit : ce que décrit
+    # slides.describe_node, identique en arbre et en flux (empreintes, workers)
+    own = ET.Element(node.tag, node.attrib)
+    own.text = node.text
+    own.extend(child for child in node if child.tag != "node" and child.find(".//node") is None)
+    return own
+
+
+class CourseTree:
+    def __init__(self, source):
+        root = ET.parse(source).getroot()
+        self.ua_title = read_ua_title(root.find("./metadata"))
+        self.look_name = (root.findtext("./design/look") or "").strip() or None
+        self.nodes = root.findall(".//node")
+
+    def __iter__(self):
+        return iter(self.nodes)
+
+
+class CourseStream:
+    # iterparse : chaque <node> est rendu dès qu'il est complet puis vidé, la
+    # mémoire reste constante quel que soit le nombre de pages du cours.
+    # Un node qui contient d'autres nodes est rendu au début de son premier
+    # enfant, avec son seul contenu propre (metadata, page...), comme le voit
+    # slides.describe_node sur l'arbre complet. Ce contenu doit précéder ses
+    # sous-nodes : placé après, il lève ValueError (il faudrait sinon garder
+    # tous les sous-nodes en mémoire jusqu'à la fin du parent).
+    def __init__(self, source):
+        self.source = source
+        self.ua_title = DEFAULT_UA_TITLE
+
+    def __iter__(self):
+        stack = []
+        emitted = set()     # nodes déjà rendus, avant leur fin
+        closed = set()      # enfants complets des nodes pas encore rendus
+        containers = set()  # éléments (<nodes>...) qui contiennent des sous-nodes
+        for event, el in ET.iterparse(self.source, events=("start", "end")):
+            if event == "start":
+                if el.tag == "node":
+                    for ancestor in reversed(stack):
+                        if ancestor.tag == "node":
+                            break
+                        containers.add(id(ancestor))
+                    parent = next((e for e in reversed(stack) if e.tag == "node"), None)
+                    if parent is not None and id(parent) not in emitted:
+                        emitted.add(id(parent))
+                        self._keep_closed(parent, closed)
+                        yield parent
+                        for child in list(parent):
+                            parent.remove(child)
+                stack.append(el)
+                continue
+
+            stack.pop()
+            if el.tag == "metadata" and len(stack) == 1:
+                self.ua_title = read_ua_title(el)
+            elif el.tag == "node":
+                if id(el) not in emitted:
+                    yield el
+                emitted.discard(id(el))
+                for child in el:
+                    closed.discard(id(child))
+                el.clear()
+                if stack and el in stack[-1]:
+                    stack[-1].remove(el)
+            elif stack and stack[-1].tag == "node":
+                owner = stack[-1]
+                if id(el) in containers:
+                    containers.discard(id(el))
+                elif id(owner) in emitted:
+                    raise ValueError(
+                        f"<{el.tag}> du node id={owner.attrib.get('id')} placé après ses sous-nodes : "
+                        "non lisible en flux, convertir sans lecture en flux"
+                    )
+                else:
+                    closed.add(id(el))
+
+    def _keep_closed(self, node, closed):
+        # iterparse lit par blocs : les enfants chargés en avance (sous-nodes, contenu
+        # placé après eux) ne sont pas encore complets et sont retirés du parent ;
+        # le résultat ne dépend pas de la taille des blocs lus
+        for child in list(node):
+            if id(child) in closed:
+                closed.discard(id(child))
+            else:
+                node.remove(child)
@@ -0,0 +1,313 @@
+import argparse
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+import uuid
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+from converter import preload_look
+from jobs import convert_upload
+from media_store import MediaStore
+
+# 🔥 Convertisseur résident : un process qui garde python-pptx et PIL chargés,
+# ainsi que les looks compilés et les decks de base des modules déjà convertis, et
+# reçoit les modules par HTTP (localhost ou socket Unix). Le pipeline de migration
+# n'appelle plus cli.py à chaque module ; la latence d'un petit module est celle
+# de la conversion, plus celle du démarrage. Avec --preload, les looks de modules
+# d'exemple sont préparés dans chaque worker avant la première requête.
+#
+#   python daemon.py --port 8765 -j 4 --preload exemples/*.zip
+#   python daemon.py --socket /tmp/ecmg.sock --media-store ~/.ecmg-media
+#
+#   curl --data-binary @module.zip -o module.pptx localhost:8765/convert
+#   curl --unix-socket /tmp/ecmg.sock --data-binary @module.zip -o module.pptx "http://ecmg/convert?image_dpi=150"
+#   curl localhost:8765/health        (état, tâches en cours)
+#   curl localhost:8765/stats         (compteurs de débit)
+#   curl localhost:8765/profile/<id>  (profilage d'une conversion faite avec ?profile=1)
+#
+# POST /convert : corps = octets du zip ; réponse = octets du pptx, avertissements
+# et compteurs dans les en-têtes X-Ecmg-Warnings / X-Ecmg-Stats (JSON ASCII).
+# Avec ?profile=1, le rapport de profilage (une entrée par page, trop gros pour un
+# en-tête) est gardé côté service : l'en-tête X-Ecmg-Profile donne son chemin,
+# GET /profile/<id>, consultable pour les MAX_PROFILES dernières conversions.
+# Zip invalide ou incomplet : 422. Au-delà de max_pending conversions en attente ou en cours : 503.
+
+PPTX_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+MAX_PROFILES = 32
+
+
+# --- côté worker ---------------------------------------------------------------
+
+_media_store = None
+
+def init_worker(media_store_options, preload=()):
+    global _media_store
+    if media_store_options is not None:
+        _media_store = MediaStore(*media_store_options)
+    # look et deck de base de chaque module d'exemple, au démarrage du worker
+    for path in preload:
+        try:
+            preload_look(path)
+        except Exception as e:
+            print(f"⚠️ {path} non préchargé : {type(e).__name__}: {e}", file=sys.stderr)
+
+def warm_up(delay):
+    # tâche vide qui occupe son worker un instant : les suivantes vont aux autres
+    time.sleep(delay)
+    return os.getpid()
+
+def run_conversion(data, image_dpi=None, profile=False):
+    return convert_upload(data, image_dpi, profile, _media_store)
+
+
+# --- côté service --------------------------------------------------------------
+
+class ConversionService:
+    def __init__(self, max_workers=2, max_pending=16, media_store_options=None, preload=()):
+        # preload : chemins de modules dont les looks sont préparés dans chaque worker
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.media_store_options = media_store_options
+        self.preload = tuple(preload)
+        self.started = time.time()
+        self.pending = 0
+        self.converted = 0
+        self.failed = 0
+        self.rejected = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.seconds = 0.0
+        self.profiles = OrderedDict()  # id -> rapport de profilage, les plus récents
+        self._lock = threading.Lock()
+        self._executor = self._new_executor()
+
+    def _new_executor(self):
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=init_worker,
+            initargs=(self.media_store_options, self.preload),
+        )
+
+    def warm_up(self, rounds=5, delay=0.2):
+        # tâches vides jusqu'à ce que chaque worker en ait traité une : tous les
+        # process sont lancés et initialisés avant la première vraie conversion
+        pids = set()
+        for _ in range(rounds):
+            futures = [self._executor.submit(warm_up, delay) for _ in range(self.max_workers)]
+            pids.update(future.result() for future in futures)
+            if len(pids) >= self.max_workers:
+                break
+        return sorted(pids)
+
+    def convert(self, data, image_dpi=None, profile=False):
+        # -> (pptx_bytes, warnings, stats) ; None si la file est pleine
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                return None
+            self.pending += 1
+            self.bytes_in += len(data)
+        started = time.perf_counter()
+        try:
+            try:
+                future = self._executor.submit(run_conversion, data, image_dpi, profile)
+            except BrokenProcessPool:
+                # un worker est mort (mémoire...) : nouveau pool pour la suite
+                with self._lock:
+                    self._executor = self._new_executor()
+                future = self._executor.submit(run_conversion, data, image_dpi, profile)
+            result = future.result()
+        except BaseException:
+            with self._lock:
+                self.failed += 1
+            raise
+        finally:
+            with self._lock:
+                self.pending -= 1
+                self.seconds += time.perf_counter() - started
+        with self._lock:
+            self.converted += 1
+            self.bytes_out += len(result[0])
+        return result
+
+    def keep_profile(self, report):
+        profile_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            self.profiles[profile_id] = report
+            while len(self.profiles) > MAX_PROFILES:
+                self.profiles.popitem(last=False)
+        return profile_id
+
+    def profile(self, profile_id):
+        with self._lock:
+            return self.profiles.get(profile_id)
+
+    def health(self):
+        with self._lock:
+            return {
+                "status": "ok",
+                "pid": os.getpid(),
+                "uptime": round(time.time() - self.started, 1),
+                "workers": self.max_workers,
+                "pending": self.pending,
+                "max_pending": self.max_pending,
+            }
+
+    def stats(self):
+        with self._lock:
+            finished = self.converted + self.failed
+            uptime = time.time() - self.started
+            return {
+                "converted": self.converted,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "pending": self.pending,
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+                "mean_seconds": round(self.seconds / finished, 3) if finished else None,
+                "modules_per_minute": round(self.converted / uptime * 60, 2) if uptime else 0.0,
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(cancel_futures=True)
+
+
+class ConversionHandler(BaseHTTPRequestHandler):
+    server_version = "ecmg2pptx"
+
+    @property
+    def service(self):
+        return self.server.service
+
+    def address_string(self):
+        # socket Unix : pas d'adresse cliente
+        return self.client_address[0] if self.client_address else "unix"
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == "/health":
+            self.send_json(200, self.service.health())
+        elif path == "/stats":
+            self.send_json(200, self.service.stats())
+        elif path.startswith("/profile/"):
+            report = self.service.profile(path[len("/profile/"):])
+            if report is None:
+                self.send_json(404, {"error": f"Profil inconnu ou expiré : {path}"})
+            else:
+                self.send_json(200, report)
+        else:
+            self.send_json(404, {"error": f"Chemin inconnu : {path}"})
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path != "/convert":
+            self.send_json(404, {"error": f"Chemin inconnu : {url.path}"})
+            return
+        query = parse_qs(url.query)
+        try:
+            image_dpi = int(query["image_dpi"][0]) if "image_dpi" in query else None
+        except ValueError:
+            self.send_json(400, {"error": "image_dpi doit être un entier"})
+            return
+        profile = query.get("profile", ["0"])[0] not in ("", "0", "false")
+
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            self.send_json(400, {"error": "Corps vide : envoyer les octets du zip"})
+            return
+        data = self.rfile.read(length)
+
+        try:
+            result = self.service.convert(data, image_dpi, profile)
+        except (FileNotFoundError, zipfile.BadZipFile) as e:
+            self.send_json(422, {"error": str(e)})
+            return
+        except Exception as e:
+            self.send_json(500, {"error": f"{type(e).__name__}: {e}"})
+            return
+        if result is None:
+            self.send_json(503, {"error": "Trop de conversions en cours, réessayer plus tard."})
+            return
+
+        pptx_bytes, warnings, stats = result
+        report = stats.pop("profile", None)
+        self.send_response(200)
+        self.send_header("Content-Type", PPTX_TYPE)
+        self.send_header("Content-Length", str(len(pptx_bytes)))
+        self.send_header("X-Ecmg-Warnings", json.dumps(warnings))
+        self.send_header("X-Ecmg-Stats", json.dumps(stats))
+        if report is not None:
+            self.send_header("X-Ecmg-Profile", f"/profile/{self.service.keep_profile(report)}")
+        self.end_headers()
+        self.wfile.write(pptx_bytes)
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        socketserver.UnixStreamServer.server_bind(self)
+        # attributs attendus par BaseHTTPRequestHandler
+        self.server_name = "localhost"
+        self.server_port = 0
+
+
+def make_server(service, host="127.0.0.1", port=8765, socket_path=None):
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)  # socket d'une exécution précédente
+        server = UnixHTTPServer(socket_path, ConversionHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), ConversionHandler)
+    server.service = service
+    return server
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Service de conversion ECMG -> PowerPoint résident (HTTP local).")
+    parser.add_argument("--host", default="127.0.0.1", help="Adresse d'écoute (défaut : 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="Port d'écoute (défaut : 8765)")
+    parser.add_argument("--socket", metavar="CHEMIN", help="Écoute sur une socket Unix plutôt qu'en TCP")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="Nombre de process de conversion")
+    parser.add_argument("--max-pending", type=int, help="Conversions en attente ou en cours au-delà desquelles on répond 503 (défaut : 4 x jobs)")
+    parser.add_argument("--media-store", metavar="DOSSIER", help="Stock persistant des tailles et images optimisées, partagé par les workers")
+    parser.add_argument("--media-store-size", type=int, default=512, help="Taille maximale du stock de médias en Mo (défaut : 512)")
+    parser.add_argument("--preload", nargs="*", default=[], metavar="ZIP", help="Modules d'exemple dont les looks sont préparés au démarrage de chaque worker")
+    args = parser.parse_args(argv)
+
+    workers = max(1, args.jobs or 1)
+    media_store_options = None
+    if args.media_store:
+        media_store_options = (args.media_store, args.media_store_size * 1024 * 1024)
+    service = ConversionService(workers, args.max_pending or workers * 4, media_store_options, args.preload)
+    pids = service.warm_up()
+    server = make_server(service, args.host, args.port, args.socket)
+    where = args.socket or f"http://{args.host}:{args.port}"
+    print(f"🔥 {len(pids)} workers prêts, en écoute sur {where}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+import io
+import os
+from functools import lru_cache
+from xml.sax.saxutils import quoteattr
+from pptx import Presentation
+from pptx.enum.shapes import PP_PLACEHOLDER
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls, qn
+from pptx.util import Inches
+from ir import REFERENCE_SIZE
+from look import TitleStyle
+from render import slide_scale
+
+# 🗂️ Deck de base d'une conversion : gabarit ouvert, taille de slide fixée et style
+# du titre d'activité (titre_activite) inscrit une fois dans le layout « titre
+# seul ». Le deck est sérialisé une fois puis gardé en mémoire du process ; chaque
+# conversion en repart (Presentation relue depuis ces octets) et ses slides
+# héritent du style du titre au lieu de le réappliquer une à une.
+
+TITLE_LAYOUT = 5
+TEXT_ALIGN = {"center": "ctr", "right": "r"}
+
+
+class BaseDeck:
+    def __init__(self, template=None, slide_size=None, title_style=None):
+        prs = Presentation(template)
+        if template is None or slide_size is not None:
+            width, height = slide_size or REFERENCE_SIZE
+            prs.slide_width = Inches(width)
+            prs.slide_height = Inches(height)
+        self.scale = slide_scale(prs)
+        if title_style is not None:
+            bake_title_style(prs.slide_layouts[TITLE_LAYOUT], title_style, self.scale)
+
+        buffer = io.BytesIO()
+        prs.save(buffer)
+        self.blob = buffer.getvalue()
+
+    def clone(self):
+        # -> (Presentation, layout des slides)
+        prs = Presentation(io.BytesIO(self.blob))
+        return prs, prs.slide_layouts[TITLE_LAYOUT]
+
+
+def bake_title_style(layout, title_style, scale=(1, 1)):
+    # Position et style de police du titre posés sur le placeholder du layout :
+    # les slides créées depuis ce layout en héritent sans rien copier.
+    title = next(
+        ph for ph in layout.placeholders
+        if ph.placeholder_format.type in (PP_PLACEHOLDER.TITLE, PP_PLACEHOLDER.CENTER_TITLE)
+    )
+    if title_style.box:
+        sx, sy = scale
+        left, top, width, height = title_style.box
+        title.left, title.top = Inches(left * sx), Inches(top * sy)
+        title.width, title.height = Inches(width * sx), Inches(height * sy)
+
+    tx_body = title._element.get_or_add_txBody()
+    lst_style = tx_body.find(qn("a:lstStyle"))
+    if lst_style is None:
+        lst_style = parse_xml(f"<a:lstStyle {nsdecls('a')}/>")
+        tx_body.find(qn("a:bodyPr")).addnext(lst_style)
+    for lvl1 in lst_style.findall(qn("a:lvl1pPr")):
+        lst_style.remove(lvl1)
+
+    fill = ""
+    if title_style.color is not None:
+        fill = f'<a:solidFill><a:srgbClr val="{title_style.color}"/></a:solidFill>'
+    lvl1 = parse_xml(
+        f'<a:lvl1pPr {nsdecls("a")} algn="{TEXT_ALIGN.get(title_style.align, "l")}">'
+        f'<a:defRPr sz="{int(round(title_style.font_size * 100))}" b="{int(title_style.bold)}" i="{int(title_style.italic)}">'
+        f'{fill}<a:latin typeface={quoteattr(title_style.font_name)}/>'
+        f'</a:defRPr></a:lvl1pPr>'
+    )
+    # a:defPPr, s'il existe, reste en tête de a:lstStyle
+    def_ppr = lst_style.find(qn("a:defPPr"))
+    if def_ppr is not None:
+        def_ppr.addnext(lvl1)
+    else:
+        lst_style.insert(0, lvl1)
+
+
+@lru_cache(maxsize=16)
+def _cached_base_deck(template, mtime, slide_size, packed_title_style):
+    title_style = TitleStyle.unpack(packed_title_style) if packed_title_style is not None else None
+    return BaseDeck(template, slide_size, title_style)
+
+def base_deck(template=None, slide_size=None, title_style=None):
+    # Deck de base partagé par toutes les conversions du process qui ont le même
+    # gabarit, la même taille de slide et le même style de titre (un look donné).
+    # Un gabarit passé en objet fichier n'est pas mis en cache.
+    if template is not None and not isinstance(template, str):
+        return BaseDeck(template, slide_size, title_style)
+    mtime = os.path.getmtime(template) if template is not None else None
+    packed = title_style.pack() if title_style is not None else None
+    return _cached_base_deck(template, mtime, tuple(slide_size) if slide_size else None, packed)
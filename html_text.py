@@ -0,0 +1,66 @@
+from functools import lru_cache
+from html.parser import HTMLParser
+
+# 📝 Extraction du texte brut d'un fragment HTML ECMG (notes, QCM, résultats...).
+# Même résultat que BeautifulSoup(html, "html.parser").get_text(separator) : chaque
+# bloc de texte et chaque marqueur est une chaîne distincte, jointe par le séparateur.
+
+MARKDOWN_MARKERS = {"b": "**", "i": "_"}
+ASCII_SPACES = "\x20\x0a\x09\x0c\x0d"
+
+
+class TextExtractor(HTMLParser):
+    def __init__(self, markers=None):
+        super().__init__()
+        self.markers = markers or {}
+        self.strings = []
+        self.open_marked = []
+        self.pending = []
+
+    def flush(self):
+        if not self.pending:
+            return
+        data = "".join(self.pending)
+        self.pending = []
+        # comme bs4 : une chaîne faite uniquement d'espaces devient " " ou "\n"
+        if not data.strip(ASCII_SPACES):
+            data = "\n" if "\n" in data else " "
+        self.strings.append(data)
+
+    def handle_starttag(self, tag, attrs):
+        self.flush()
+        if tag in self.markers:
+            self.strings.append(self.markers[tag])
+            self.open_marked.append(tag)
+
+    def handle_endtag(self, tag):
+        self.flush()
+        if tag not in self.open_marked:
+            return
+        # comme html.parser/bs4 : fermer une balise ferme aussi celles ouvertes dedans
+        while self.open_marked:
+            open_tag = self.open_marked.pop()
+            self.strings.append(self.markers[open_tag])
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        self.pending.append(data)
+
+    def handle_comment(self, data):
+        self.flush()
+
+    def close(self):
+        super().close()
+        self.flush()
+        while self.open_marked:
+            self.strings.append(self.markers[self.open_marked.pop()])
+
+
+@lru_cache(maxsize=2048)
+def html_to_text(html, separator="", markdown=False):
+    # markdown=True : **gras** et _italique_ comme dans les notes Carousel/Vista
+    extractor = TextExtractor(MARKDOWN_MARKERS if markdown else None)
+    extractor.feed(html or "")
+    extractor.close()
+    return separator.join(extractor.strings)
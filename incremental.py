@@ -0,0 +1,103 @@
+import hashlib
+import marshal
+import os
+import posixpath
+from ir import Page, IR_VERSION
+
+# ♻️ Reconversion incrémentale : chaque node est identifié par une empreinte de son
+# contenu (XML du node + styles du look et textes author qu'il référence + hash
+# des médias qu'il cite). Les ir.Page de la conversion précédente sont gardées à
+# côté de la sortie ; à la version suivante du module, seules les pages dont
+# l'empreinte a changé sont redécrites.
+
+STORE_MAGIC = b"ECPG"
+STORE_VERSION = 1
+
+
+def node_fingerprint(node, node_xml, context, ua_title):
+    h = hashlib.sha1()
+    h.update(f"{STORE_VERSION}/{IR_VERSION}\0{ua_title}\0".encode())
+    h.update(repr(context.layout.calibration.pack()).encode())
+    h.update(node_xml)
+
+    screen_ids = []
+    for el in node.iter():
+        for attr in ("id", "author_id"):
+            ref = el.attrib.get(attr)
+            if ref is None:
+                continue
+            style = context.style_map.get(ref)
+            if style is not None:
+                h.update(repr((ref, sorted(style.items()))).encode())
+            if ref in context.author_map:
+                h.update(repr((ref, context.author_map[ref])).encode())
+        if el.tag == "screen":
+            screen_ids.append(el.attrib.get("id"))
+
+        file_name = el.attrib.get("file") if el.tag == "content" else None
+        if file_name:
+            h.update(media_digest(context, posixpath.basename(file_name.replace("\\", "/"))))
+
+    for look_el in context.look_elements_for_page(node.attrib.get("id"), *screen_ids):
+        h.update(repr((look_el.id, look_el.tag, sorted(look_el.style.items()), look_el.file, look_el.html, look_el.box)).encode())
+        if look_el.file:
+            h.update(media_digest(context, look_el.file))
+    return h.hexdigest()
+
+def media_digest(context, file_name):
+    # membre résolu + CRC32 de l'index central du zip : aucun octet de média relu
+    digest = []
+    for directory in (context.course_dir, context.look_dir):
+        member = posixpath.normpath(posixpath.join(directory, file_name))
+        digest.append((member, context.members.get(member)))
+    return repr(digest).encode()
+
+
+class PageStore:
+    # previous : pages de la conversion précédente ; current : celles de la conversion
+    # en cours, seules réécrites sur disque (les nodes disparus ne s'accumulent pas)
+    def __init__(self, previous=None):
+        self.previous = previous or {}
+        self.current = {}
+        self.reused = 0
+        self.rebuilt = 0
+
+    def get(self, fingerprint):
+        packed = self.previous.get(fingerprint)
+        if packed is None:
+            return None
+        self.current[fingerprint] = packed
+        self.reused += 1
+        return Page.unpack(packed)
+
+    def put(self, fingerprint, page):
+        self.current[fingerprint] = page.pack()
+        self.rebuilt += 1
+
+    def dumps(self):
+        return STORE_MAGIC + bytes([STORE_VERSION]) + marshal.dumps(self.current)
+
+    @classmethod
+    def loads(cls, data):
+        if data[:4] != STORE_MAGIC or data[4] != STORE_VERSION:
+            raise ValueError("Fichier de pages invalide ou d'une autre version.")
+        return cls(marshal.loads(data[5:]))
+
+    @classmethod
+    def load(cls, path):
+        # pas de conversion précédente (ou illisible) : tout sera reconstruit
+        try:
+            with open(path, "rb") as f:
+                return cls.loads(f.read())
+        except (OSError, ValueError, EOFError, TypeError):
+            return cls()
+
+    def save(self, path):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(self.dumps())
+        os.replace(tmp_path, path)
+
+
+def store_path_for(output_path):
+    return output_path + ".pages"
@@ -0,0 +1,185 @@
+import hashlib
+import io
+import marshal
+from look import TitleStyle
+from package import EcmgPackage
+
+# 🧱 Représentation intermédiaire d'un module : ce que slides.py décrit et ce que
+# render.py rejoue. Objets à __slots__ (compacts, picklables pour le pool de
+# process) et sérialisation binaire via marshal : un module lu une fois peut être
+# re-rendu (autre taille de slide, autre gabarit, autres options) sans relire ni
+# le zip ni les XML.
+#
+# Géométrie en pouces, rapportée à la slide de référence 12 x 7.3 ; les runs de
+# texte riche sont ceux de richtext.compile_html.
+
+IR_MAGIC = b"ECIR"
+IR_VERSION = 5
+REFERENCE_SIZE = (12, 7.3)
+
+
+class TextShape:
+    __slots__ = ("box", "paragraphs", "text", "align", "valign", "word_wrap")
+
+    def __init__(self, box, paragraphs=None, text=None, align=None, valign=None, word_wrap=None):
+        self.box = box
+        self.paragraphs = paragraphs
+        self.text = text
+        self.align = align
+        self.valign = valign
+        self.word_wrap = word_wrap
+
+    def pack(self):
+        return ("text", self.box, self.paragraphs, self.text, self.align, self.valign, self.word_wrap)
+
+
+class PictureShape:
+    # l'image est centrée et ajustée dans sa zone au moment du rendu (taille réelle connue)
+    __slots__ = ("member", "area", "source")
+
+    def __init__(self, member, area, source):
+        self.member = member
+        self.area = area
+        self.source = source
+
+    def pack(self):
+        return ("picture", self.member, self.area, self.source)
+
+
+# Sons et vidéos embarquables : extension -> type MIME de la partie média
+MEDIA_TYPES = {
+    ".mp3": "audio/mpeg",
+    ".wav": "audio/wav",
+    ".m4a": "audio/mp4",
+    ".mp4": "video/mp4",
+    ".m4v": "video/mp4",
+}
+
+
+class MediaShape:
+    # son ("audio") ou vidéo ("video") du package, copié tel quel dans le pptx au rendu
+    __slots__ = ("member", "box", "kind", "source")
+
+    def __init__(self, member, box, kind, source):
+        self.member = member
+        self.box = box
+        self.kind = kind
+        self.source = source
+
+    def pack(self):
+        return ("media", self.member, self.box, self.kind, self.source)
+
+
+SHAPE_TYPES = {"text": TextShape, "picture": PictureShape, "media": MediaShape}
+
+def unpack_shape(packed):
+    return SHAPE_TYPES[packed[0]](*packed[1:])
+
+
+class Page:
+    # Une slide : titre, formes dans l'ordre d'empilement, sections de notes
+    # (tuples de lignes, écrites en paragraphes par render.write_notes)
+    __slots__ = ("id", "title", "shapes", "notes", "warnings")
+
+    def __init__(self, page_id, title, shapes=None, notes=None, warnings=None):
+        self.id = page_id
+        self.title = title
+        self.shapes = shapes if shapes is not None else []
+        self.notes = notes if notes is not None else []
+        self.warnings = warnings if warnings is not None else []
+
+    def pack(self):
+        return (self.id, self.title, tuple(shape.pack() for shape in self.shapes), tuple(tuple(section) for section in self.notes), tuple(self.warnings))
+
+    @classmethod
+    def unpack(cls, packed):
+        page_id, title, shapes, notes, warnings = packed
+        return cls(page_id, title, [unpack_shape(shape) for shape in shapes], list(notes), list(warnings))
+
+
+class Course:
+    # Module complet : pages + style du titre + octets des images référencées.
+    # Les sons et vidéos ne sont pas copiés : ils restent dans le zip d'origine
+    # (source, chemin) et y sont relus par blocs à l'écriture du pptx.
+    __slots__ = ("ua_title", "title_style", "pages", "media", "warnings", "source", "_package")
+
+    def __init__(self, ua_title, title_style, pages=None, media=None, warnings=None, source=None):
+        self.ua_title = ua_title
+        self.title_style = title_style
+        self.pages = pages if pages is not None else []
+        self.media = media if media is not None else {}
+        self.warnings = warnings if warnings is not None else []
+        self.source = source
+        self._package = None
+
+    def package(self):
+        # zip d'origine, ouvert au premier clip rendu
+        if self._package is None:
+            if self.source is None:
+                raise FileNotFoundError("Zip d'origine inconnu : sons et vidéos introuvables.")
+            self._package = EcmgPackage(self.source)
+        return self._package
+
+    # même interface que EcmgPackage pour MediaRegistry
+    def open_member(self, member):
+        if member in self.media:
+            return io.BytesIO(self.media[member])
+        return self.package().open_member(member)
+
+    def reopen_member(self, member):
+        if member in self.media:
+            return io.BytesIO(self.media[member])
+        return self.package().reopen_member(member)
+
+    def member_size(self, member):
+        if member in self.media:
+            return len(self.media[member])
+        return self.package().member_size(member)
+
+    def member_digest(self, member):
+        if member in self.media:
+            return hashlib.sha1(self.media[member]).hexdigest()
+        return self.package().member_digest(member)
+
+    def referenced_members(self):
+        members = []
+        for page in self.pages:
+            for shape in page.shapes:
+                if isinstance(shape, PictureShape) and shape.member not in members:
+                    members.append(shape.member)
+        return members
+
+
+    def dumps(self):
+        payload = (
+            self.ua_title,
+            self.title_style.pack(),
+            tuple(page.pack() for page in self.pages),
+            self.media,
+            tuple(self.warnings),
+            self.source,
+        )
+        return IR_MAGIC + bytes([IR_VERSION]) + marshal.dumps(payload)
+
+    @classmethod
+    def loads(cls, data):
+        if data[:4] != IR_MAGIC or data[4] != IR_VERSION:
+            raise ValueError("Représentation intermédiaire invalide ou d'une autre version.")
+        ua_title, title_style, pages, media, warnings, source = marshal.loads(data[5:])
+        return cls(
+            ua_title,
+            TitleStyle.unpack(title_style),
+            [Page.unpack(page) for page in pages],
+            media,
+            list(warnings),
+            source,
+        )
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.dumps())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.loads(f.read())
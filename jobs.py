@@ -0,0 +1,194 @@
+import io
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from converter import convert
+from media_store import MediaStore
+from profiling import Profiler
+
+# 🧵 File de conversions pour le service Streamlit : chaque upload devient une tâche
+# (identifiant, état, progression par slide) exécutée par un pool de process borné.
+# Le script Streamlit ne fait plus que soumettre puis interroger la tâche ; une
+# grosse conversion ne bloque plus la session, et les conversions simultanées de
+# plusieurs utilisateurs sont limitées à max_workers process.
+#
+# Les workers remontent leur progression par une multiprocessing.Queue ; un thread
+# du process Streamlit la dépile et met à jour les tâches. Au-delà de max_queued
+# tâches en attente ou en cours, submit lève QueueFull.
+
+JOB_TTL = 600  # secondes pendant lesquelles une tâche terminée reste consultable
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+ERROR = "error"
+
+
+class QueueFull(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, key):
+        self.id = uuid.uuid4().hex[:12]
+        self.key = key
+        self.status = QUEUED
+        self.done = 0
+        self.total = None
+        self.result = None   # (pptx_bytes, warnings, stats)
+        self.error = None
+        self.submitted = time.time()
+        self.finished = None
+
+    @property
+    def active(self):
+        return self.status in (QUEUED, RUNNING)
+
+
+# --- côté worker ---------------------------------------------------------------
+
+_progress_queue = None
+_media_store = None
+
+def init_worker(progress_queue, media_store_options):
+    global _progress_queue, _media_store
+    _progress_queue = progress_queue
+    if media_store_options is not None:
+        _media_store = MediaStore(*media_store_options)
+
+# 💾 Tout en mémoire : le zip est lu depuis les octets de l'upload, le pptx est
+# écrit dans un buffer slide par slide pendant le rendu (sons et vidéos copiés par
+# blocs) ; aucun fichier temporaire sur le disque du conteneur.
+def convert_upload(data, image_dpi=None, profile=False, media_store=None, progress=None):
+    warnings = []
+    stats = {}
+    profiler = Profiler() if profile else None
+    buffer = io.BytesIO()
+    convert(io.BytesIO(data), warnings, image_dpi, stats, profiler=profiler, output=buffer, media_store=media_store, progress=progress)
+    if profiler is not None:
+        stats["profile"] = profiler.report()
+    if media_store is not None:
+        media_store.evict_if_needed()
+    return buffer.getvalue(), warnings, stats
+
+def run_job(job_id, data, image_dpi, profile):
+    def progress(done, total):
+        _progress_queue.put((job_id, done, total))
+
+    _progress_queue.put((job_id, 0, None))
+    return convert_upload(data, image_dpi, profile, _media_store, progress)
+
+
+# --- côté service --------------------------------------------------------------
+
+class JobQueue:
+    def __init__(self, max_workers=2, max_queued=8, media_store_options=None):
+        # media_store_options : (dossier, taille max) du MediaStore ouvert dans chaque worker
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.media_store_options = media_store_options
+        self._jobs = {}
+        self._by_key = {}
+        self._lock = threading.Lock()
+        self._progress = multiprocessing.Queue()
+        self._executor = self._new_executor()
+        threading.Thread(target=self._listen, daemon=True).start()
+
+    def _new_executor(self):
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=init_worker,
+            initargs=(self._progress, self.media_store_options),
+        )
+
+    def _listen(self):
+        while True:
+            job_id, done, total = self._progress.get()
+            with self._lock:
+                job = self._jobs.get(job_id)
+                # un message de progression peut arriver après le résultat
+                if job is not None and job.active:
+                    job.status = RUNNING
+                    job.done = done
+                    job.total = total
+
+    def submit(self, key, data, image_dpi=None, profile=False):
+        # une tâche par clé : un rerun ou un second utilisateur avec le même zip
+        # et les mêmes options retrouve la tâche existante
+        with self._lock:
+            self._purge()
+            job = self._jobs.get(self._by_key.get(key))
+            if job is not None and (job.active or job.status == DONE):
+                return job
+            if sum(1 for j in self._jobs.values() if j.active) >= self.max_queued:
+                raise QueueFull("Trop de conversions en cours, réessayez dans quelques instants.")
+            job = Job(key)
+            self._jobs[job.id] = job
+            self._by_key[key] = job.id
+            try:
+                future = self._executor.submit(run_job, job.id, data, image_dpi, profile)
+            except BrokenProcessPool:
+                # un worker est mort (mémoire...) : nouveau pool pour les tâches suivantes
+                self._executor = self._new_executor()
+                future = self._executor.submit(run_job, job.id, data, image_dpi, profile)
+        future.add_done_callback(lambda f: self._finish(job, f))
+        return job
+
+    def _finish(self, job, future):
+        with self._lock:
+            error = future.exception()
+            if error is None:
+                job.result = future.result()
+                job.status = DONE
+            else:
+                job.error = str(error) or type(error).__name__
+                job.status = ERROR
+            job.finished = time.time()
+
+    def _purge(self):
+        now = time.time()
+        for job_id, job in list(self._jobs.items()):
+            if job.finished is not None and now - job.finished > JOB_TTL:
+                self._drop(job)
+
+    def _drop(self, job):
+        self._jobs.pop(job.id, None)
+        if self._by_key.get(job.key) == job.id:
+            del self._by_key[job.key]
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def forget(self, job_id):
+        # le résultat a été repris (cache des conversions) : plus besoin de le garder
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and not job.active:
+                self._drop(job)
+
+    def position(self, job):
+        # nombre de tâches en attente soumises avant celle-ci
+        with self._lock:
+            return sum(1 for j in self._jobs.values() if j.status == QUEUED and j.submitted < job.submitted)
+
+    def stats(self):
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+        return {
+            "queued": statuses.count(QUEUED),
+            "running": statuses.count(RUNNING),
+            "workers": self.max_workers,
+            "max_queued": self.max_queued,
+        }
+
+
+def media_store_options_from_env():
+    directory = os.environ.get("ECMG_MEDIA_STORE")
+    if not directory:
+        return None
+    return directory, int(os.environ.get("ECMG_MEDIA_STORE_MB", "512")) * 1024 * 1024
@@ -0,0 +1,141 @@
+from functools import lru_cache
+
+# 📐 Géométrie ECMG -> pouces de la slide de référence (12 x 7.3).
+# Deux espaces de coordonnées : celui du cours (course.xml, unités propres à
+# l'éditeur ECMG) et celui du look (look.xml, pixels d'écran). Chacun est une
+# transformation affine par axe, précalculée une fois à partir d'un profil de
+# calibration ; le LayoutResolver d'un module résout ensuite les zones de tous
+# les éléments d'un écran en une passe et garde en cache celles déjà vues.
+
+POSITION_ATTRS = ("left", "top", "width", "height")
+
+
+class AxisTransform:
+    # pouces = (valeur + offset) * scale
+    __slots__ = ("scale", "offset")
+
+    def __init__(self, scale, offset=0.0):
+        self.scale = scale
+        self.offset = offset
+
+    def __call__(self, value):
+        return (float(value) + self.offset) * self.scale
+
+
+class Calibration:
+    # course_width / course_height : étendue du cours en unités ECMG pour
+    # design_width x design_height pixels d'écran ; course_top_offset corrige le
+    # décalage vertical du cours ; inches_per_px : pixel d'écran -> pouce.
+    __slots__ = ("name", "course_width", "course_height", "course_top_offset", "design_width", "design_height", "inches_per_px")
+
+    def __init__(self, name, course_width, course_height, course_top_offset, design_width, design_height, inches_per_px):
+        self.name = name
+        self.course_width = course_width
+        self.course_height = course_height
+        self.course_top_offset = course_top_offset
+        self.design_width = design_width
+        self.design_height = design_height
+        self.inches_per_px = inches_per_px
+
+    def course_transforms(self):
+        return (
+            AxisTransform(self.design_width / self.course_width * self.inches_per_px),
+            AxisTransform(self.design_height / self.course_height * self.inches_per_px, self.course_top_offset),
+        )
+
+    def look_transform(self):
+        return AxisTransform(self.inches_per_px)
+
+    def pack(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+
+# Profils connus ; "ecmg" reprend les constantes mesurées sur les modules ECMG actuels
+CALIBRATIONS = {
+    "ecmg": Calibration("ecmg", 149.351, 152.838, 10.917, 1150, 700, 0.01043),
+}
+DEFAULT_CALIBRATION = "ecmg"
+
+def get_calibration(calibration=None):
+    # nom de profil, Calibration ou None (profil par défaut)
+    if calibration is None:
+        calibration = DEFAULT_CALIBRATION
+    if isinstance(calibration, Calibration):
+        return calibration
+    try:
+        return CALIBRATIONS[calibration]
+    except KeyError:
+        raise ValueError(f"Profil de calibration inconnu : {calibration}") from None
+
+
+def has_position_attrs(d):
+    return d is not None and any(attr in d.attrib and float(d.attrib[attr]) > 0 for attr in POSITION_ATTRS)
+
+@lru_cache(maxsize=None)
+def pixel_transform(pixels, inches):
+    # règle de trois px -> pouces (utils.relative_px_to_inches)
+    return AxisTransform(inches / pixels)
+
+def aspect_fit(area, ratio):
+    # zone (left, top, width, height) d'une image de rapport largeur/hauteur `ratio`,
+    # centrée dans `area` en conservant ses proportions
+    left, top, width, height = area
+    if ratio > width / height:
+        draw_height = width / ratio
+        return left, top + (height - draw_height) / 2, width, draw_height
+    draw_width = height * ratio
+    return left + (width - draw_width) / 2, top, draw_width, height
+
+
+# Dimensions par défaut des éléments d'écran sans largeur/hauteur explicite
+DEFAULT_SIZES = {"image": (200, 200)}
+DEFAULT_SIZE = (140, 10)
+
+
+class LayoutResolver:
+    # Un par module (picklable, transmis aux workers avec le SlideContext). Le cache
+    # est indexé par id d'élément + attributs de position du cours + tailles par
+    # défaut : le style du look associé à un id est fixe pour tout le module.
+    def __init__(self, calibration=None):
+        self.calibration = get_calibration(calibration)
+        self.course_x, self.course_y = self.calibration.course_transforms()
+        self.look = self.calibration.look_transform()
+        self._boxes = {}
+
+    def look_box(self, attrs, default_width, default_height):
+        look = self.look
+        return (
+            look(attrs.get("left", 0)),
+            look(attrs.get("top", 0)),
+            look(attrs.get("width", default_width)),
+            look(attrs.get("height", default_height)),
+        )
+
+    def design_box(self, el_id, design_el, style, default_width, default_height):
+        # Position du XML du cours si elle existe, sinon celle du look
+        attrs = design_el.attrib if design_el is not None else {}
+        key = (el_id, tuple(attrs.get(attr) for attr in POSITION_ATTRS), default_width, default_height)
+        box = self._boxes.get(key)
+        if box is None:
+            if has_position_attrs(design_el):
+                box = (
+                    self.course_x(attrs.get("left", 0)),
+                    self.course_y(attrs.get("top", 0)),
+                    self.course_x(attrs.get("width", default_width)),
+                    self.course_y(attrs.get("height", default_height)),
+                )
+            else:
+                box = self.look_box(style, default_width, default_height)
+            self._boxes[key] = box
+        return box
+
+    def resolve_screen(self, screen, style_map, tags=("consigne", "image", "text")):
+        # Zones de tous les éléments positionnés d'un écran, en une passe -> {élément: zone}
+        boxes = {}
+        for el in screen:
+            if el.tag not in tags:
+                continue
+            el_id = el.attrib.get("id") or el.attrib.get("author_id")
+            default_width, default_height = DEFAULT_SIZES.get(el.tag, DEFAULT_SIZE)
+            boxes[el] = self.design_box(el_id, el.find("design"), style_map.get(el_id, {}), default_width, default_height)
+        return boxes
@@ -0,0 +1,161 @@
+import hashlib
+import io
+import posixpath
+import threading
+from collections import OrderedDict
+from xml.etree import ElementTree as ET
+from units import font_px_to_pt
+from layout import LayoutResolver, has_position_attrs
+
+# 🎨 Modèle compilé de look.xml : construit une fois par module, les slides ne
+# relisent plus jamais l'arbre XML du look.
+
+# Éléments du look injectés sur certaines pages (clé : id du node ou du screen)
+LOOK_ELEMENTS_BY_PAGE = {
+    "page_intro": ["cadre_intro", "title_UA_intro"],
+}
+
+
+def normalize_color(value):
+    # "#13abb5" -> "13ABB5", None si la couleur n'est pas un hexadécimal sur 6 chiffres
+    color = value.lstrip("#").upper()
+    if len(color) == 6:
+        try:
+            int(color, 16)
+            return color
+        except ValueError:
+            pass
+    return None
+
+
+class LookElement:
+    # Élément du look prêt à poser : géométrie en pouces, style brut pour HTMLtoPPTX
+    def __init__(self, el_id, el, style, layout):
+        self.id = el_id
+        self.tag = el.tag
+        self.style = style
+        design_el = el.find("design")
+        content_el = el.find("content")
+        self.file = content_el.attrib.get("file") if content_el is not None else None
+        self.html = content_el.text if content_el is not None else None
+        self.box = None
+        if has_position_attrs(design_el):
+            self.box = layout.look_box(design_el.attrib, 140, 10)
+
+
+class TitleStyle:
+    # Style du titre d'activité (titre_activite) résolu une fois pour toutes les slides.
+    # Valeurs simples (pouces, points, couleur hex, alignement texte) : sérialisable
+    # avec la représentation intermédiaire, converti en objets python-pptx au rendu.
+    __slots__ = ("box", "font_name", "font_size", "bold", "italic", "color", "align")
+
+    def __init__(self, style=None, warnings=None, layout=None):
+        self.box = None
+        if style:
+            try:
+                left, top, width, height = (layout or LayoutResolver()).look_box(style, 800, 50)
+                self.box = (left + 0.1, top + 0.1, width, height)
+            except Exception as e:
+                if warnings is not None:
+                    warnings.append(f"❗ Erreur redimension titre: {e}")
+
+        style = style or {}
+        self.font_name = style.get("font", "Tahoma")
+        try:
+            self.font_size = font_px_to_pt(int(style.get("fontsize", 22)))
+        except:
+            self.font_size = 16.5
+        self.bold = style.get("bold", "0") == "1"
+        self.italic = style.get("italic", "0") == "1"
+        self.color = normalize_color(style.get("fontcolor", "#000000"))
+        self.align = style.get("align", "left").lower()
+
+    def pack(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    @classmethod
+    def unpack(cls, packed):
+        title_style = cls.__new__(cls)
+        for name, value in zip(cls.__slots__, packed):
+            setattr(title_style, name, value)
+        return title_style
+
+
+class CompiledLook:
+    def __init__(self, look_root, warnings=None, page_elements=LOOK_ELEMENTS_BY_PAGE, layout=None):
+        if warnings is None:
+            warnings = []
+        if layout is None:
+            layout = LayoutResolver()
+        # avertissements de la compilation, rejoués à chaque module qui réutilise ce look
+        self.warnings = []
+        self.elements_by_id = {}
+        self.style_map = {}
+        for el in look_root.findall(".//*[@id]"):
+            self.elements_by_id.setdefault(el.attrib["id"], el)
+            design = el.find("design")
+            if design is not None:
+                self.style_map[el.attrib["id"]] = design.attrib
+                if "author_id" in el.attrib:
+                    self.style_map[el.attrib["author_id"]] = design.attrib
+
+        self.title_style = TitleStyle(self.style_map.get("titre_activite"), self.warnings, layout)
+        warnings.extend(self.warnings)
+
+        # images citées par look.xml (nom de fichier) et leurs tailles en pixels,
+        # indexées par empreinte du membre : remplies au rendu, partagées entre modules
+        self.asset_files = {
+            posixpath.basename(content.attrib["file"].replace("\\", "/"))
+            for content in look_root.iter("content")
+            if content.attrib.get("file")
+        }
+        self.asset_sizes = {}
+
+        self.page_elements = {}
+        for page_id, el_ids in page_elements.items():
+            self.page_elements[page_id] = [
+                LookElement(el_id, self.elements_by_id[el_id], self.style_map.get(el_id, {}), layout)
+                for el_id in el_ids
+                if el_id in self.elements_by_id
+            ]
+
+    @classmethod
+    def parse(cls, source, warnings=None, layout=None):
+        return cls(ET.parse(source).getroot(), warnings, layout=layout)
+
+
+class LookCache:
+    # Looks compilés partagés entre les conversions d'un même process (lot, service) :
+    # les modules d'un même look ne relisent plus look.xml. Clé = nom du look cité par
+    # course.xml + sha1 de look.xml + calibration ; les moins récemment utilisés
+    # sont évincés au-delà de max_entries.
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, look_name, data, warnings=None, layout=None):
+        # data : octets de look.xml
+        if layout is None:
+            layout = LayoutResolver()
+        key = (look_name, hashlib.sha1(data).hexdigest(), layout.calibration.pack())
+        with self._lock:
+            look = self._entries.get(key)
+            if look is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if look is None:
+            look = CompiledLook.parse(io.BytesIO(data), layout=layout)
+            with self._lock:
+                self.misses += 1
+                self._entries[key] = look
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        if warnings is not None:
+            warnings.extend(look.warnings)
+        return look
+
+# cache du process : chaque worker d'un lot ou du service garde ses looks d'un module à l'autre
+LOOK_CACHE = LookCache()
@@ -0,0 +1,244 @@
+import io
+import math
+import posixpath
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from PIL import Image
+from pptx.media import SPEAKER_IMAGE_BYTES
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.oxml.ns import qn
+from pptx.oxml.shapes.picture import CT_Picture
+from pptx.parts.image import Image as PptxImage, ImagePart
+from pptx.parts.media import MediaPart
+from ir import MEDIA_TYPES
+from media_store import optimized_key
+
+# 🖼️ Lecture des dimensions dans l'en-tête du fichier (PNG, GIF, JPEG),
+# sans décoder l'image. Pillow sert de repli pour les autres formats.
+def probe_image_size(head):
+    if head[:8] == b"\x89PNG\r\n\x1a\n" and head[12:16] == b"IHDR":
+        return struct.unpack(">II", head[16:24])
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return struct.unpack("<HH", head[6:10])
+    if head[:2] == b"\xff\xd8":
+        i = 2
+        while i + 9 < len(head):
+            if head[i] != 0xFF:
+                i += 1
+                continue
+            marker = head[i + 1]
+            if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7 or marker == 0xFF:
+                i += 1 if marker == 0xFF else 2
+                continue
+            length = struct.unpack(">H", head[i + 2:i + 4])[0]
+            # SOF0..SOF15 sauf DHT (C4), JPG (C8) et DAC (CC)
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                height, width = struct.unpack(">HH", head[i + 5:i + 9])
+                return width, height
+            i += 2 + length
+    return None
+
+EMU_PER_INCH = 914400
+REENCODE_FORMATS = ("PNG", "JPEG")
+
+# 🗜️ Rééchantillonne une image à sa taille d'affichage (en EMU) pour la résolution
+# demandée et la réencode dans son format d'origine. Renvoie None si rien n'est gagné.
+def downscale_image(blob, width_emu, height_emu, dpi, jpeg_quality=85):
+    with Image.open(io.BytesIO(blob)) as im:
+        if im.format not in REENCODE_FORMATS:
+            return None
+        target_w = max(1, math.ceil(width_emu / EMU_PER_INCH * dpi))
+        target_h = max(1, math.ceil(height_emu / EMU_PER_INCH * dpi))
+        scale = max(target_w / im.width, target_h / im.height)
+        fmt = im.format
+        if scale < 1:
+            size = (max(1, round(im.width * scale)), max(1, round(im.height * scale)))
+            out_im = im.resize(size, Image.LANCZOS)
+        else:
+            out_im = im.copy()
+
+    buffer = io.BytesIO()
+    if fmt == "JPEG":
+        if out_im.mode not in ("RGB", "L", "CMYK"):
+            out_im = out_im.convert("RGB")
+        out_im.save(buffer, "JPEG", quality=jpeg_quality, optimize=True)
+    else:
+        out_im.save(buffer, "PNG", optimize=True)
+    out = buffer.getvalue()
+    return out if len(out) < len(blob) else None
+
+
+class PackageMediaPart(MediaPart):
+    # Son ou vidéo du package : aucun octet gardé en mémoire, le membre du zip est
+    # relu par blocs à l'écriture du pptx par pptx_stream.StreamingDeckWriter.
+    # prs.save reste possible : il lit alors chaque clip d'un seul bloc.
+    def __init__(self, partname, content_type, package, opener, size):
+        super().__init__(partname, content_type, package)
+        self.opener = opener
+        self.size = size
+
+    @property
+    def blob(self):
+        with self.opener() as f:
+            return f.read()
+
+    def open(self):
+        return self.opener()
+
+
+class MediaRegistry:
+    # Un registre par conversion : chaque membre du zip est lu, mesuré et
+    # transformé en ImagePart une seule fois, puis réutilisé sur toutes les slides.
+    HEAD_SIZE = 64 * 1024
+
+    def __init__(self, package, store=None, look=None):
+        self.package = package
+        # media_store.MediaStore optionnel, partagé entre conversions
+        self.store = store
+        # look.CompiledLook optionnel : tailles de ses images gardées avec le look en cache
+        self.look = look
+        self._sizes = {}
+        self._parts = {}
+        self._parts_by_sha1 = {}
+        # plus grande taille d'affichage (EMU) de chaque partie image
+        self._display_sizes = {}
+        self._media_parts = {}
+        self._media_parts_by_digest = {}
+        self._poster_part = None
+
+    def size(self, member):
+        if member not in self._sizes:
+            look_sizes = self.look.asset_sizes if self.is_look_asset(member) else None
+            digest = self.package.member_digest(member) if self.store is not None or look_sizes is not None else None
+            size = look_sizes.get(digest) if look_sizes is not None else None
+            if size is None and self.store is not None:
+                size = self.store.image_size(digest)
+            if size is None:
+                size = self.probe(member)
+                if self.store is not None:
+                    self.store.put_image_size(digest, size)
+            if look_sizes is not None:
+                look_sizes[digest] = size
+            self._sizes[member] = size
+        return self._sizes[member]
+
+    def is_look_asset(self, member):
+        # image citée par look.xml et rangée dans son dossier
+        look_dir = getattr(self.package, "look_dir", None)
+        return (
+            self.look is not None
+            and look_dir is not None
+            and posixpath.dirname(member) == look_dir
+            and posixpath.basename(member) in self.look.asset_files
+        )
+
+    def probe(self, member):
+        with self.package.open_member(member) as f:
+            head = f.read(self.HEAD_SIZE)
+        size = probe_image_size(head)
+        if size is None:
+            with self.package.open_member(member) as f, Image.open(f) as im:
+                size = im.size
+        return size
+
+    def image_part(self, slide_part, member):
+        if member not in self._parts:
+            with self.package.open_member(member) as f:
+                blob = f.read()
+            image = PptxImage.from_blob(blob, posixpath.basename(member))
+            # deux membres au contenu identique partagent la même partie image
+            part = self._parts_by_sha1.get(image.sha1)
+            if part is None:
+                part = ImagePart.new(slide_part.package, image)
+                self._parts_by_sha1[image.sha1] = part
+            self._parts[member] = part
+        return self._parts[member]
+
+    def add_picture(self, slide, member, left, top, width, height):
+        shapes = slide.shapes
+        image_part = self.image_part(slide.part, member)
+        rId = slide.part.relate_to(image_part, RT.IMAGE)
+        # comme shapes._add_pic_from_image_part, sans relire l'image pour sa taille
+        # native (la taille affichée est toujours fournie)
+        shape_id = shapes._next_shape_id
+        pic = shapes._grpSp.add_pic(shape_id, "Picture %d" % (shape_id - 1), image_part.desc, rId, left, top, width, height)
+        shapes._recalculate_extents()
+        shown_w, shown_h = self._display_sizes.get(image_part, (0, 0))
+        self._display_sizes[image_part] = (max(shown_w, pic.cx), max(shown_h, pic.cy))
+        return shapes._shape_factory(pic)
+
+    def media_part(self, slide_part, member):
+        if member not in self._media_parts:
+            # un clip repris sur plusieurs pages (ou sous deux chemins) n'est copié qu'une fois
+            digest = self.package.member_digest(member)
+            part = self._media_parts_by_digest.get(digest)
+            if part is None:
+                ext = posixpath.splitext(member)[1].lower()
+                part = PackageMediaPart(
+                    slide_part.package.next_media_partname(ext[1:]),
+                    MEDIA_TYPES[ext],
+                    slide_part.package,
+                    partial(self.package.reopen_member, member),
+                    self.package.member_size(member),
+                )
+                self._media_parts_by_digest[digest] = part
+            self._media_parts[member] = part
+        return self._media_parts[member]
+
+    def poster_part(self, slide_part):
+        # icône haut-parleur de python-pptx, une seule partie image par conversion
+        if self._poster_part is None:
+            self._poster_part = ImagePart.new(slide_part.package, PptxImage.from_blob(SPEAKER_IMAGE_BYTES, "speaker.png"))
+        return self._poster_part
+
+    def add_media(self, slide, member, kind, left, top, width, height):
+        # comme shapes.add_movie, sans lire le clip : relations média + vidéo/audio
+        # vers la partie, icône en aperçu, commande de lecture dans le minutage
+        slide_part = slide.part
+        part = self.media_part(slide_part, member)
+        media_rId = slide_part.relate_to(part, RT.MEDIA)
+        link_rId = slide_part.relate_to(part, RT.AUDIO if kind == "audio" else RT.VIDEO)
+        poster_rId = slide_part.relate_to(self.poster_part(slide_part), RT.IMAGE)
+
+        shapes = slide.shapes
+        shape_id = shapes._next_shape_id
+        name = "Audio %d" if kind == "audio" else "Movie %d"
+        pic = CT_Picture.new_video_pic(shape_id, name % (shape_id - 1), link_rId, media_rId, poster_rId, left, top, width, height)
+        timing = slide._element.get_or_add_childTnLst()
+        timing.add_video(shape_id)
+        if kind == "audio":
+            pic.xpath("./p:nvPicPr/p:nvPr/a:videoFile")[0].tag = qn("a:audioFile")
+            timing[-1].tag = qn("p:audio")
+        shapes._spTree.append(pic)
+        return shapes._shape_factory(pic)
+
+    def downscaled_blob(self, part, dpi, jpeg_quality=85):
+        # octets réduits à la plus grande taille d'affichage connue, ou None si rien à gagner
+        if part not in self._display_sizes:
+            return None  # icône des sons et vidéos
+        width, height = self._display_sizes[part]
+        if self.store is None:
+            return downscale_image(part.blob, width, height, dpi, jpeg_quality)
+        key = optimized_key(part.sha1, width, height, dpi, jpeg_quality)
+        blob = self.store.optimized(key)
+        if blob is None:
+            blob = downscale_image(part.blob, width, height, dpi, jpeg_quality)
+            self.store.put_optimized(key, blob)
+        return blob or None
+
+    def optimize_images(self, dpi, jpeg_quality=85, max_workers=None):
+        # étape optionnelle, à lancer une fois toutes les slides construites :
+        # les images sont traitées en parallèle (Pillow libère le GIL)
+        parts = list(self._display_sizes)
+        before = sum(len(part.blob) for part in parts)
+
+        def work(part):
+            return part, self.downscaled_blob(part, dpi, jpeg_quality)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for part, blob in pool.map(work, parts):
+                if blob is not None:
+                    part.blob = blob
+        after = sum(len(part.blob) for part in parts)
+        return before, after
@@ -0,0 +1,117 @@
+import json
+import os
+import threading
+
+# 🗄️ Stock de médias partagé entre conversions (et entre process d'un lot) :
+# adressé par le contenu, il garde la taille en pixels de chaque image et ses
+# versions optimisées. Les logos, cadres et fonds communs à tous les modules d'un
+# même look ne sont plus sondés ni réencodés qu'une fois.
+#
+#   <dossier>/<hash[:2]>/<hash>.size   taille (json [largeur, hauteur])
+#   <dossier>/<hash[:2]>/<clé>.img     octets optimisés (vide : rien à gagner)
+#
+# Écritures atomiques (os.replace) ; éviction par taille totale, les fichiers les
+# moins récemment utilisés d'abord (mtime rafraîchi à chaque lecture). Un lot
+# évince une fois à la fin ; un service résident appelle evict_if_needed après
+# chaque conversion, qui ne parcourt le dossier qu'une fois EVICT_SLACK x max_bytes
+# octets écrits par le process depuis la dernière éviction.
+
+EVICT_SLACK = 0.1
+
+
+class MediaStore:
+    def __init__(self, directory, max_bytes=512 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.written = 0  # octets écrits depuis la dernière éviction
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, name, suffix):
+        return os.path.join(self.directory, name[:2], name + suffix)
+
+    def _read(self, path, mode):
+        try:
+            with open(path, mode) as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def _write(self, path, data, mode):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, mode) as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            with self._lock:
+                self.written += len(data)
+        except OSError:
+            # stock plein ou en lecture seule : la conversion continue sans lui
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def image_size(self, digest):
+        data = self._read(self._path(digest, ".size"), "r")
+        if data is None:
+            return None
+        try:
+            width, height = json.loads(data)
+        except ValueError:
+            return None
+        return width, height
+
+    def put_image_size(self, digest, size):
+        self._write(self._path(digest, ".size"), json.dumps(list(size)), "w")
+
+    def optimized(self, key):
+        # -> octets optimisés, b"" si l'image n'y gagnait rien, None si inconnue
+        return self._read(self._path(key, ".img"), "rb")
+
+    def put_optimized(self, key, blob):
+        self._write(self._path(key, ".img"), blob or b"", "wb")
+
+    def evict_if_needed(self):
+        with self._lock:
+            if self.written < self.max_bytes * EVICT_SLACK:
+                return 0
+        return self.evict()
+
+    def evict(self):
+        with self._lock:
+            self.written = 0
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+        entries.sort()
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+
+def optimized_key(sha1, width, height, dpi, jpeg_quality):
+    return f"{sha1}-{width}x{height}-{dpi}-{jpeg_quality}"
@@ -0,0 +1,84 @@
+import posixpath
+import zipfile
+from contextlib import contextmanager
+
+# 📦 Lecture d'un module ECMG directement depuis l'index central du zip :
+# aucun extractall, les médias ne sont lus que lorsqu'une slide les référence.
+PACKAGE_FILES = ("course.xml", "look.xml", "author.xml")
+
+
+def resolve_member(members, directory, file_name):
+    # chemin relatif au dossier d'un des XML -> nom du membre dans le zip, ou None
+    member = posixpath.normpath(posixpath.join(directory, file_name.replace("\\", "/")))
+    return member if member in members else None
+
+
+class EcmgPackage:
+    def __init__(self, source):
+        # source : chemin du zip ou objet fichier (upload Streamlit, BytesIO...)
+        self.source = source
+        self.zip = zipfile.ZipFile(source, "r")
+        self.members = {}
+        for info in self.zip.infolist():
+            if not info.is_dir():
+                self.members[info.filename] = info
+
+        found = {}
+        for name in self.members:
+            base = posixpath.basename(name)
+            if base in PACKAGE_FILES:
+                # en cas de doublon, le fichier le moins profond l'emporte
+                if base not in found or name.count("/") < found[base].count("/"):
+                    found[base] = name
+        self.course_member = found.get("course.xml")
+        self.look_member = found.get("look.xml")
+        self.author_member = found.get("author.xml")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.zip.close()
+
+    @property
+    def is_complete(self):
+        return all((self.course_member, self.look_member, self.author_member))
+
+    @property
+    def course_dir(self):
+        return posixpath.dirname(self.course_member or "")
+
+    @property
+    def look_dir(self):
+        return posixpath.dirname(self.look_member or "")
+
+    def open_member(self, member):
+        return self.zip.open(self.members[member])
+
+    @contextmanager
+    def reopen_member(self, member):
+        # lisible même après close() : les sons et vidéos ne sont copiés qu'à
+        # l'écriture du pptx, éventuellement une fois la conversion terminée ;
+        # le zip rouvert est refermé avec le membre
+        with zipfile.ZipFile(self.source, "r") as zf, zf.open(self.members[member]) as f:
+            yield f
+
+    def open_course(self):
+        return self.open_member(self.course_member)
+
+    def open_look(self):
+        return self.open_member(self.look_member)
+
+    def open_author(self):
+        return self.open_member(self.author_member)
+
+    def member_size(self, member):
+        return self.members[member].file_size
+
+    def member_digest(self, member):
+        # empreinte du contenu lue dans l'index central (CRC32 + taille), sans décompresser
+        info = self.members[member]
+        return f"{info.CRC:08x}{info.file_size:x}"
@@ -0,0 +1,103 @@
+import shutil
+import time
+import zipfile
+from pptx.opc.oxml import serialize_part_xml
+from pptx.opc.packuri import CONTENT_TYPES_URI, PACKAGE_URI
+from pptx.opc.serialized import _ContentTypesItem
+from pptx.parts.image import ImagePart
+from pptx.parts.slide import NotesSlidePart
+from media import PackageMediaPart
+
+# 🚚 Écriture du pptx slide par slide : dès qu'une slide est rendue, sa partie XML,
+# ses notes et ses nouvelles images partent dans le zip de sortie, puis sont vidées
+# en mémoire. Seules les parties communes (présentation, masques, layouts, thèmes),
+# les relations du package et [Content_Types].xml sont écrites à la fin.
+#
+# Les parties vidées restent dans le graphe python-pptx (nom et type de contenu
+# intacts) : la numérotation des slides et des images et les content types
+# restent corrects.
+#
+# Avec image_dpi, chaque image est réduite à sa taille d'affichage sur la première
+# slide qui l'utilise (elle est déjà écrite quand les slides suivantes la montrent).
+#
+# Les sons et vidéos (media.PackageMediaPart) sont copiés du zip source vers le
+# pptx par blocs de MEDIA_CHUNK octets, sans compression (déjà compressés) ;
+# save_deck les écrit de la même façon pour un deck rendu entièrement en mémoire.
+
+MEDIA_CHUNK = 1024 * 1024
+
+
+class StreamingDeckWriter:
+    def __init__(self, target, media=None, image_dpi=None):
+        # target : chemin du .pptx ou objet fichier ouvert en écriture binaire
+        self.zip = zipfile.ZipFile(target, "w", zipfile.ZIP_DEFLATED)
+        self.media = media
+        self.image_dpi = image_dpi
+        self.written = set()
+        self.image_bytes_before = 0
+        self.image_bytes_after = 0
+
+    def write_part(self, part, blob=None):
+        self.zip.writestr(part.partname.membername, part.blob if blob is None else blob)
+        if part._rels:
+            self.zip.writestr(part.partname.rels_uri.membername, part.rels.xml)
+        self.written.add(part.partname)
+
+    def write_media(self, part):
+        info = zipfile.ZipInfo(part.partname.membername, time.localtime()[:6])
+        info.compress_type = zipfile.ZIP_STORED
+        info.file_size = part.size  # zip64 décidé d'après la taille annoncée
+        with part.open() as src, self.zip.open(info, "w") as dst:
+            shutil.copyfileobj(src, dst, MEDIA_CHUNK)
+        self.written.add(part.partname)
+
+    def write_image(self, part):
+        blob = part.blob
+        self.image_bytes_before += len(blob)
+        if self.image_dpi and self.media is not None:
+            blob = self.media.downscaled_blob(part, self.image_dpi) or blob
+        self.image_bytes_after += len(blob)
+        self.write_part(part, blob)
+        part._blob = b""
+
+    def slide_done(self, slide):
+        slide_part = slide.part
+        for rel in list(slide_part.rels.values()):
+            if rel.is_external:
+                continue
+            target = rel.target_part
+            if target.partname in self.written:
+                continue
+            if isinstance(target, ImagePart):
+                self.write_image(target)
+            elif isinstance(target, PackageMediaPart):
+                self.write_media(target)
+            elif isinstance(target, NotesSlidePart):
+                self.write_part(target)
+                target._element.clear()
+        self.write_part(slide_part)
+        slide_part._element.clear()
+
+    def abort(self):
+        # conversion interrompue : le zip est fermé, le fichier partiel reste à supprimer
+        self.zip.close()
+
+    def close(self, prs):
+        package = prs.part.package
+        parts = list(package.iter_parts())
+        for part in parts:
+            if part.partname in self.written:
+                continue
+            if isinstance(part, PackageMediaPart):
+                self.write_media(part)
+            else:
+                self.write_part(part)
+        self.zip.writestr(CONTENT_TYPES_URI.membername, serialize_part_xml(_ContentTypesItem.xml_for(parts)))
+        self.zip.writestr(PACKAGE_URI.rels_uri.membername, package._rels.xml)
+        self.zip.close()
+
+
+def save_deck(prs, target):
+    # équivalent de prs.save pour une Presentation rendue en mémoire : les sons et
+    # vidéos sont copiés du zip source par blocs au lieu d'être lus d'un seul bloc
+    StreamingDeckWriter(target).close(prs)
@@ -0,0 +1,113 @@
+import time
+from contextlib import nullcontext
+from richtext import _compile_html
+from html_text import html_to_text
+
+# ⏱️ Instrumentation d'une conversion : temps et nombre d'appels par phase, par page
+# et par type d'élément. Désactivée par défaut : les fonctions reçoivent
+# profiler=None et timed() renvoie alors un nullcontext partagé, sans horloge.
+
+
+class Timer:
+    __slots__ = ("bucket", "key", "started")
+
+    def __init__(self, bucket, key):
+        self.bucket = bucket
+        self.key = key
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        add(self.bucket, self.key, time.perf_counter() - self.started)
+
+
+class Laps:
+    # chronomètre à étapes : chaque appel attribue à `kind` le temps écoulé depuis le précédent
+    __slots__ = ("bucket", "last")
+
+    def __init__(self, bucket):
+        self.bucket = bucket
+        self.last = time.perf_counter()
+
+    def __call__(self, kind, count=1):
+        now = time.perf_counter()
+        add(self.bucket, kind, now - self.last, count)
+        self.last = now
+
+
+def no_laps(kind, count=1):
+    pass
+
+
+def add(bucket, key, seconds, count=1):
+    entry = bucket.get(key)
+    if entry is None:
+        bucket[key] = [seconds, count]
+    else:
+        entry[0] += seconds
+        entry[1] += count
+
+
+class Profiler:
+    def __init__(self):
+        self.phases = {}      # nom -> [secondes, appels]
+        self.elements = {}    # type d'élément -> [secondes, nombre]
+        self.pages = []       # une entrée par slide, dans l'ordre
+        self.rendered = 0
+
+    def phase(self, name):
+        return Timer(self.phases, name)
+
+    def laps(self):
+        return Laps(self.elements)
+
+    def add_phase(self, name, seconds):
+        add(self.phases, name, seconds)
+
+    # pages décrites puis rendues dans le même ordre : la n-ième page rendue
+    # complète la n-ième entrée
+    def page_described(self, page, seconds):
+        self.pages.append({"id": page.id, "title": page.title, "shapes": len(page.shapes), "describe": seconds, "render": 0.0})
+
+    def page_rendered(self, seconds):
+        add(self.phases, "render", seconds)
+        if self.rendered < len(self.pages):
+            self.pages[self.rendered]["render"] = seconds
+        self.rendered += 1
+
+    def dump(self):
+        # forme picklable renvoyée par les workers du pool de description
+        return self.phases, self.elements
+
+    def merge(self, dumped):
+        phases, elements = dumped
+        for bucket, other in ((self.phases, phases), (self.elements, elements)):
+            for key, (seconds, count) in other.items():
+                add(bucket, key, seconds, count)
+
+    def report(self):
+        return {
+            "phases": {name: {"seconds": s, "calls": n} for name, (s, n) in self.phases.items()},
+            "elements": {kind: {"seconds": s, "count": n} for kind, (s, n) in sorted(self.elements.items(), key=lambda item: -item[1][0])},
+            "pages": self.pages,
+            "caches": cache_stats(),
+        }
+
+
+NO_TIMER = nullcontext()
+
+def timed(profiler, name):
+    return profiler.phase(name) if profiler is not None else NO_TIMER
+
+def element_laps(profiler):
+    return profiler.laps() if profiler is not None else no_laps
+
+def cache_stats():
+    # taux de réussite des caches de fragments HTML (en-têtes/pieds répétés), process courant
+    stats = {}
+    for name, func in (("compile_html", _compile_html), ("html_to_text", html_to_text)):
+        info = func.cache_info()
+        stats[name] = {"hits": info.hits, "misses": info.misses, "size": info.currsize}
+    return stats
@@ -0,0 +1,105 @@
+from pptx.util import Inches
+from pptx.enum.text import PP_ALIGN, MSO_ANCHOR
+from richtext import write_runs
+from ir import PictureShape, MediaShape, REFERENCE_SIZE
+from layout import aspect_fit
+from profiling import element_laps
+
+# 🖨️ Étape 2 de la conversion : rejoue les ir.Page de slides.py dans la
+# Presentation python-pptx. Appelé sur un seul thread, dans l'ordre des nodes.
+# La géométrie de l'IR (pouces, slide 12 x 7.3) est mise à l'échelle de la slide cible.
+
+ALIGNMENTS = {"center": PP_ALIGN.CENTER, "right": PP_ALIGN.RIGHT}
+ANCHORS = {"middle": MSO_ANCHOR.MIDDLE, "bottom": MSO_ANCHOR.BOTTOM}
+
+
+def slide_scale(prs):
+    # rapport exact (1.0) sur la slide de référence : même géométrie qu'avant l'échelle
+    return (prs.slide_width / Inches(REFERENCE_SIZE[0]), prs.slide_height / Inches(REFERENCE_SIZE[1]))
+
+def scaled_box(box, scale):
+    left, top, width, height = box
+    sx, sy = scale
+    return Inches(left * sx), Inches(top * sy), Inches(width * sx), Inches(height * sy)
+
+def fit_picture(slide, media, member, area, scale=(1, 1)):
+    # Image centrée dans sa zone en conservant ses proportions
+    sx, sy = scale
+    orig_width_px, orig_height_px = media.size(member)
+    left, top, width, height = aspect_fit(
+        (area[0] * sx, area[1] * sy, area[2] * sx, area[3] * sy),
+        orig_width_px / orig_height_px,
+    )
+
+    media.add_picture(
+        slide,
+        member,
+        Inches(left + 0.1 * sx),
+        Inches(top + 0.1 * sy),
+        width=Inches(width),
+        height=Inches(height)
+    )
+
+def add_text_shape(slide, shape, scale=(1, 1)):
+    box = slide.shapes.add_textbox(*scaled_box(shape.box, scale))
+    tf = box.text_frame
+    if shape.word_wrap is not None:
+        tf.word_wrap = shape.word_wrap
+    if shape.text is not None:
+        tf.text = shape.text
+    if shape.align is not None:
+        tf.paragraphs[0].alignment = ALIGNMENTS.get(shape.align, PP_ALIGN.LEFT)
+    if shape.valign is not None:
+        tf.vertical_anchor = ANCHORS.get(shape.valign, MSO_ANCHOR.TOP)
+    if shape.paragraphs is not None:
+        write_runs(tf, shape.paragraphs)
+
+def apply_title(slide, title_text):
+    # position et style du titre inscrits dans le layout (deck.BaseDeck) : texte seul
+    tf = slide.shapes.title.text_frame
+    tf.clear()
+    tf.paragraphs[0].add_run().text = title_text
+
+def notes_paragraphs(sections):
+    # une ligne (ou morceau de ligne multiligne) par paragraphe, un paragraphe vide entre deux sections
+    for i, section in enumerate(sections):
+        if i:
+            yield ""
+        for line in section:
+            yield from line.split("\n")
+
+def write_notes(slide, sections):
+    # un seul remplacement du cadre de notes, paragraphes créés d'un coup
+    slide.notes_slide.notes_text_frame.text = "\n".join(notes_paragraphs(sections))
+
+def render_slide(prs, layout, page, media, warnings, scale=(1, 1), profiler=None):
+    lap = element_laps(profiler)
+    slide = prs.slides.add_slide(layout)
+    apply_title(slide, page.title)
+    lap("pptx:title")
+
+    for shape in page.shapes:
+        if isinstance(shape, PictureShape):
+            try:
+                fit_picture(slide, media, shape.member, shape.area, scale)
+            except Exception as e:
+                warnings.append(f"⚠️ Erreur ajout image {shape.source} : {e}")
+            lap("pptx:picture")
+        elif isinstance(shape, MediaShape):
+            try:
+                media.add_media(slide, shape.member, shape.kind, *scaled_box(shape.box, scale))
+            except Exception as e:
+                warnings.append(f"⚠️ Erreur ajout média {shape.source} : {e}")
+            lap("pptx:media")
+        else:
+            add_text_shape(slide, shape, scale)
+            lap("pptx:text")
+
+    # Notes écrites en une fois, seulement s'il y a quelque chose à écrire
+    # (sinon aucune page de notes n'est créée)
+    if page.notes:
+        write_notes(slide, page.notes)
+        lap("pptx:notes")
+
+    warnings.extend(page.warnings)
+    return slide
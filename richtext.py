@@ -0,0 +1,121 @@
+from functools import lru_cache
+from html.parser import HTMLParser
+from pptx.util import Pt
+from pptx.dml.color import RGBColor
+from look import normalize_color
+from units import font_px_to_pt
+
+# ✍️ HTML ECMG -> texte riche PowerPoint.
+# Le HTML est d'abord compilé en paragraphes de runs minimaux (runs vides supprimés,
+# runs voisins de même style fusionnés), mémorisés par fragment : les en-têtes et
+# pieds de page répétés sur chaque slide ne sont analysés qu'une fois.
+# Un run compilé est un tuple picklable (texte, (gras, italique, police, couleur hex, taille pt)).
+
+STYLE_KEYS = ("font", "fontcolor", "fontsize")
+
+
+class HTMLtoPPTX(HTMLParser):
+    def __init__(self, style=None):
+        super().__init__()
+        style = style or {}
+        self.bold = False
+        self.italic = False
+        self.font_style = {key: style[key] for key in STYLE_KEYS if key in style}
+        self.font_stack = []
+        self.paragraphs = [[]]
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+
+        if tag == "b":
+            self.bold = True
+        elif tag == "i":
+            self.italic = True
+        elif tag == "font":
+            self.font_stack.append(dict(self.font_style))
+            if "face" in attrs:
+                self.font_style["font"] = attrs["face"]
+            if "color" in attrs:
+                self.font_style["fontcolor"] = attrs["color"]
+            if "size" in attrs:
+                try:
+                    self.font_style["fontsize"] = int(attrs["size"])
+                except:
+                    pass
+        elif tag == "br":
+            self.paragraphs.append([])
+
+    def handle_endtag(self, tag):
+        if tag == "b":
+            self.bold = False
+        elif tag == "i":
+            self.italic = False
+        elif tag == "font" and self.font_stack:
+            self.font_style = self.font_stack.pop()
+
+    def handle_data(self, data):
+        if not data:
+            return
+        style = (
+            self.bold,
+            self.italic,
+            self.font_style.get("font"),
+            self.font_style.get("fontcolor"),
+            self.font_style.get("fontsize"),
+        )
+        runs = self.paragraphs[-1]
+        if runs and runs[-1][1] == style:
+            runs[-1] = (runs[-1][0] + data, style)
+        else:
+            runs.append((data, style))
+
+
+@lru_cache(maxsize=256)
+def resolve_run_style(style):
+    bold, italic, font, fontcolor, fontsize = style
+    size = None
+    if fontsize is not None:
+        try:
+            size = font_px_to_pt(int(fontsize))
+        except:
+            pass
+    color = normalize_color(fontcolor) if fontcolor is not None else None
+    return bold, italic, font, color, size
+
+@lru_cache(maxsize=1024)
+def _compile_html(html, font, fontcolor, fontsize):
+    style = {key: value for key, value in zip(STYLE_KEYS, (font, fontcolor, fontsize)) if value is not None}
+    parser = HTMLtoPPTX(style)
+    parser.feed(html)
+    parser.close()
+    return tuple(
+        tuple((text, resolve_run_style(run_style)) for text, run_style in runs)
+        for runs in parser.paragraphs
+    )
+
+def compile_html(html, style=None):
+    style = style or {}
+    return _compile_html(html, *(style.get(key) for key in STYLE_KEYS))
+
+def write_runs(text_frame, paragraphs):
+    alignment = text_frame.paragraphs[0].alignment
+    for i, runs in enumerate(paragraphs):
+        if i == 0:
+            p = text_frame.paragraphs[0]
+        else:
+            p = text_frame.add_paragraph()
+            p.alignment = alignment  # hérite de l'alignement du premier
+        for text, (bold, italic, font_name, color, size) in runs:
+            run = p.add_run()
+            run.text = text
+            font = run.font
+            if bold:
+                font.bold = True
+            if italic:
+                font.italic = True
+            if font_name:
+                font.name = font_name
+            if color is not None:
+                font.color.rgb = RGBColor.from_string(color)
+            if size is not None:
+                font.size = Pt(size)
@@ -0,0 +1,351 @@
+import os
+from xml.etree import ElementTree as ET
+from package import resolve_member
+from layout import LayoutResolver
+from richtext import compile_html
+from html_text import html_to_text
+from ir import TextShape, PictureShape, MediaShape, MEDIA_TYPES, Page
+from profiling import Profiler, element_laps
+
+# 🧩 Étape 1 de la conversion : chaque <node> devient une ir.Page (titre, formes,
+# notes). Aucune dépendance à la Presentation, ce qui permet de construire les pages
+# dans un pool de process ; render.py les rejoue ensuite dans python-pptx sur un
+# seul thread.
+
+LABEL_STYLE = (True, False, "Arial", None, 12)
+VIDEO_BOX = (3, 2, 6, 3.4)
+AUDIO_ICON = 0.5  # icônes des sons alignées en bas à gauche
+
+
+class SlideContext:
+    # Tout ce dont la description d'un node a besoin en dehors du node lui-même
+    def __init__(self, style_map, page_elements, author_map, members, course_dir, look_dir, layout=None):
+        self.style_map = style_map
+        self.page_elements = page_elements
+        self.author_map = author_map
+        self.members = members
+        self.course_dir = course_dir
+        self.look_dir = look_dir
+        self.layout = layout or LayoutResolver()
+
+    @classmethod
+    def from_package(cls, package, look, author_map, layout=None):
+        return cls(
+            look.style_map,
+            look.page_elements,
+            author_map,
+            # nom du membre -> CRC32 : résolution des chemins et empreintes incrémentales
+            {name: info.CRC for name, info in package.members.items()},
+            package.course_dir,
+            package.look_dir,
+            layout,
+        )
+
+    def look_elements_for_page(self, *page_ids):
+        for page_id in page_ids:
+            if page_id in self.page_elements:
+                return self.page_elements[page_id]
+        return []
+
+
+def text_box(left, top, width, height, paragraphs=None, text=None, align=None, valign=None, word_wrap=None):
+    return TextShape((left, top, width, height), paragraphs, text, align, valign, word_wrap)
+
+def label_box(text):
+    # Label visuel en haut à droite de la slide
+    return text_box(9.4, 0.2, 2.4, 0.6, paragraphs=(((text, LABEL_STYLE),),), align="right", word_wrap=True)
+
+def styled_text_box(html, style, box):
+    left, top, width, height = box
+    return text_box(
+        left + 0.1, top + 0.1, width, height,
+        paragraphs=compile_html(html, style),
+        align=style.get("align", "").lower() or "left",
+        valign=style.get("valign", "").lower() if "valign" in style else None,
+        word_wrap=True,
+    )
+
+
+def describe_content_items(screen, slide, type_name, label_icon):
+    content_el = screen.find(f".//content[@type='{type_name}']")
+    if content_el is None:
+        return
+
+    bullet_lines = [f"{label_icon} Vue {type_name} :"]
+
+    if type_name == "Cards":
+        cards_wrapper = content_el.find("cards")
+        if cards_wrapper is not None:
+            for card in cards_wrapper.findall("card"):
+                face_el = card.find("face")
+                back_el = card.find("back")
+
+                face_raw = "".join(face_el.itertext()) if face_el is not None else ""
+                back_raw = "".join(back_el.itertext()) if back_el is not None else ""
+
+                face_text = html_to_text(face_raw).strip()
+                back_text = html_to_text(back_raw).strip()
+
+                bullet_lines.append("• Face :")
+                bullet_lines.append(face_text)
+                bullet_lines.append("• Back :")
+                bullet_lines.append(back_text)
+                bullet_lines.append("")
+
+    elif type_name == "Carousel" or type_name == "Vista":
+        items_el = content_el.find("items")
+        if items_el is not None:
+            for item in items_el.findall("item"):
+                raw = "".join(item.itertext()).strip()
+                text = html_to_text(raw, separator="\n", markdown=True).strip()
+                bullet_lines.append(f"• {text}")
+
+    if len(bullet_lines) > 1:
+        slide.notes.append(tuple(bullet_lines))
+        slide.shapes.append(label_box(f"{label_icon} Cartes {type_name}"))
+
+def describe_consignes(screen, slide, context, boxes):
+    for el in screen.findall("consigne"):
+        content_el = el.find("content")
+        if content_el is None or not content_el.text:
+            continue
+
+        text_id = el.attrib.get("id") or el.attrib.get("author_id")
+        style = context.style_map.get(text_id, {})
+        slide.shapes.append(styled_text_box(content_el.text, style, boxes[el]))
+
+def resolve_media(context, file_name):
+    # son ou vidéo embarquable du package -> membre du zip, sinon None
+    name = os.path.basename(file_name)
+    if os.path.splitext(name)[1].lower() not in MEDIA_TYPES:
+        return None
+    return (
+        resolve_member(context.members, context.course_dir, name)
+        or resolve_member(context.members, context.look_dir, name)
+    )
+
+# 🔧 Fichiers externes (PDF) : lien dans les notes + pictogramme sur la slide
+def describe_external_links(screen, slide):
+    for action in screen.iter("action"):
+        if action.attrib.get("action") == "open":
+            param = action.attrib.get("param", "")
+            if param.endswith(".pdf") and param.startswith("@/"):
+                slide.notes.append((f"Lien vers un document externe : {param}",))
+                slide.shapes.append(text_box(10, 0.3, 2, 0.5, text="📎 Voir document joint", align="right", word_wrap=True))
+
+
+def describe_screen_element(el, context, boxes):
+    # <image> ou <text> posé directement sur le screen -> forme, sinon None
+    # boxes : zones de l'écran résolues par context.layout.resolve_screen
+    if el.tag == "image":
+        content = el.find("content")
+        if content is None or not content.attrib.get("file"):
+            return None
+        img_file = content.attrib["file"]
+        area = boxes[el]
+
+        image_name = os.path.basename(img_file)
+        image_member = (
+            resolve_member(context.members, context.course_dir, image_name)
+            or resolve_member(context.members, context.look_dir, image_name)
+        )
+        if image_member:
+            return PictureShape(image_member, area, img_file)
+
+    elif el.tag == "text":
+        content_el = el.find("content")
+        if content_el is None or not content_el.text:
+            return None
+
+        text_id = el.attrib.get("id") or el.attrib.get("author_id")
+        style = context.style_map.get(text_id, {})
+        return styled_text_box(content_el.text, style, boxes[el])
+    return None
+
+
+def describe_node(node, context, ua_title, profiler=None):
+    lap = element_laps(profiler)
+    title_el = node.find("./metadata/title")
+    slide = Page(
+        node.attrib.get("id"),
+        title_el.text.strip() if title_el is not None and title_el.text else "Sans titre",
+    )
+    shapes = slide.shapes
+    notes = slide.notes
+
+    # page propre au node : un node de section n'emprunte pas celle de ses sous-nodes
+    page = node.find("page")
+    page_type = page.attrib.get("type", "") if page is not None else ""
+    screen = page.find("screen") if page is not None else None
+    lap("node")
+
+    # 🔁 Éléments de look.xml spécifiques à certaines pages
+    screen_id = screen.attrib.get("id") if screen is not None else None
+    for look_el in context.look_elements_for_page(node.attrib.get("id"), screen_id):
+        if look_el.box is None:
+            continue
+        left, top, width, height = look_el.box
+
+        if look_el.tag == "image" and look_el.file:
+            image_member = resolve_member(context.members, context.look_dir, look_el.file)
+            if image_member:
+                shapes.append(PictureShape(image_member, look_el.box, look_el.file))
+        elif look_el.tag in ["text", "title"]:
+            shapes.append(text_box(
+                left + 0.1, top + 0.1, width, height,
+                paragraphs=compile_html(look_el.html or ua_title, look_el.style),
+                word_wrap=True,
+            ))
+    lap("look")
+
+    # ⚠️ Ne pas s'arrêter pour les pages de type "result"
+    if screen is None and page_type != "result":
+        return slide
+
+    if page_type == "result":
+        shapes.append(label_box("📊 Page Bilan"))
+
+        # Extraction des textes de résultat dans les notes
+        results_el = page.find("results")
+        if results_el is not None:
+            result_lines = ["🧾 Résultats affichés selon score :"]
+
+            for result in results_el.findall("result"):
+                score = result.attrib.get("score", "?")
+                screen_result = result.find("screen")
+                if screen_result is None:
+                    continue
+                text_block = screen_result.find("text")
+                if text_block is None:
+                    continue
+                content_el = text_block.find("content")
+                if content_el is None:
+                    continue
+
+                raw = "".join(content_el.itertext())
+                clean_text = html_to_text(raw).strip()
+                result_lines += ["---", f"🔢 Score {score} :", clean_text]
+
+            notes.append(tuple(result_lines))
+        else:
+            slide.warnings.append(f"Aucune balise <results> trouvée dans node id={node.attrib.get('id')}")
+        lap("result")
+
+    if screen is None:
+        return slide
+
+    # ✅ Contenu spécifique selon type (Vista, Cards, Carousel)
+    describe_content_items(screen, slide, "Vista", "🪟")
+    describe_content_items(screen, slide, "Cards", "🃏")
+    describe_content_items(screen, slide, "Carousel", "🎠")
+    lap("elfe")
+
+    # 📐 Zones des consignes, images et textes de l'écran, résolues en une passe
+    boxes = context.layout.resolve_screen(screen, context.style_map)
+
+    # ✅ Consignes au début du traitement de l'écran
+    describe_consignes(screen, slide, context, boxes)
+    lap("consigne")
+
+    # ✅ Liens vers documents PDF
+    describe_external_links(screen, slide)
+    lap("link")
+
+    y = 1.5
+    # 🎥 Vidéo (si présente)
+    video_file = None
+    for content_el in screen.findall(".//content"):
+        if "file" in content_el.attrib and content_el.attrib["file"].endswith(".mp4"):
+            video_file = content_el.attrib["file"]
+            break
+    if video_file:
+        video_member = resolve_media(context, video_file)
+        if video_member:
+            shapes.append(MediaShape(video_member, VIDEO_BOX, "video", video_file))
+        else:
+            shapes.append(text_box(3, 3, 6, 1, text=f" Vidéo : {video_file} à intégrer", align="center"))
+
+    # 🎞️ Flash (animation à convertir)
+    for flash_el in screen.findall(".//flash"):
+        content_el = flash_el.find("content")
+        if content_el is not None and "file" in content_el.attrib:
+            flash_file = content_el.attrib["file"]
+            shapes.append(text_box(
+                1, 5.5, 10, 0.6,
+                text=f"🎞️ Animation Flash à recréer ou convertir depuis ECMG : {flash_file}",
+                align="left",
+                word_wrap=True,
+            ))
+            notes.append((f"Contenu Flash détecté : {flash_file}",))
+    lap("video")
+
+    # 🔊 Sons (audio) : clip sur la slide, texte lu dans les notes
+    audio_notes = []
+    audio_members = []
+    for snd in screen.findall(".//sound"):
+        author_id = snd.attrib.get("author_id")
+        content = snd.find("content")
+        filename = content.attrib.get("file") if content is not None else None
+        audio_text = context.author_map.get(author_id)
+        if filename:
+            if audio_notes:
+                audio_notes.append("---")
+            audio_notes += [f"Audio : {filename}", f"Texte lu : {audio_text or '[non trouvé]'}"]
+            audio_member = resolve_media(context, filename)
+            if audio_member and audio_member not in audio_members:
+                audio_members.append(audio_member)
+                left = 0.3 + (AUDIO_ICON + 0.2) * (len(audio_members) - 1)
+                shapes.append(MediaShape(audio_member, (left, 6.6, AUDIO_ICON, AUDIO_ICON), "audio", filename))
+    if audio_notes:
+        notes.append(tuple(audio_notes))
+    lap("sound")
+
+    # ❓ QCM (MCQText)
+    elfe = screen.find("elfe")
+    if elfe is not None and elfe.find("content") is not None and elfe.find("content").attrib.get("type") == "MCQText":
+        items = elfe.find("content/items")
+        question_el = screen.find("question")
+        if question_el is not None:
+            question_text = html_to_text(question_el.find("content").text)
+            shapes.append(text_box(1, y, 10, 1, text=f"❓ {question_text}"))
+            y += 1.0
+        for item in items.findall("item") if items is not None else []:
+            score = item.attrib.get("score", "0")
+            label = "✅" if int(score) > 0 else "⬜"
+            shapes.append(text_box(1.2, y, 9.5, 0.5, text=f"{label} {item.text.strip()}"))
+            y += 0.5
+        feedback_lines = []
+        for fb in page.findall(".//feedbacks/correc/fb/screen/feedback"):
+            fb_content = fb.find("content")
+            if fb_content is not None and fb_content.text:
+                feedback_lines += ["---", html_to_text(fb_content.text, separator="\n")]
+        if feedback_lines:
+            notes.append(tuple(feedback_lines))
+    lap("mcq")
+
+    # 🖼️ Images et textes du screen, dans l'ordre d'apparition du XML (profondeur)
+    for el in list(screen):
+        shape = describe_screen_element(el, context, boxes)
+        if shape is not None:
+            shapes.append(shape)
+        lap(el.tag if el.tag in ("image", "text") else "screen")
+
+    return slide
+
+
+# ⚙️ Pool de process : le contexte est transmis une fois par worker, puis chaque
+# tâche ne reçoit que le XML sérialisé de son node.
+_worker_context = None
+
+def init_worker(context):
+    global _worker_context
+    _worker_context = context
+
+def describe_node_xml(node_xml, ua_title, profile=False):
+    if not profile:
+        return describe_node(ET.fromstring(node_xml), _worker_context, ua_title)
+    # profil du worker renvoyé avec la page, fusionné par le process principal
+    profiler = Profiler()
+    with profiler.phase("describe"):
+        page = describe_node(ET.fromstring(node_xml), _worker_context, ua_title, profiler)
+    return page, profiler.dump()
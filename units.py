@@ -0,0 +1,14 @@
+# 🔠 Tailles de police ECMG (px) -> PowerPoint (points) ; la géométrie est dans layout.py
+
+px_to_pt = {
+    20: 15,
+    25: 18,
+    30: 22,
+    35: 26,
+    40: 30,
+    45: 34,
+    50: 38
+}
+
+def font_px_to_pt(px):
+    return px_to_pt.get(px, int(px * 0.75))
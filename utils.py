@@ -2,14 +2,15 @@ from pptx import Presentation
 from pptx.util import Inches
 import xml.etree.ElementTree as ET
 import os
-from bs4 import BeautifulSoup
+from html_text import html_to_text
+from layout import pixel_transform
 
 # ⚙️ Conversion px ➜ pouces relative à la taille réelle de la slide
 def relative_px_to_inches(px, axis='x', slide_width_px=1150, slide_height_px=700, slide_inches=(11.98, 7.29)):
     if axis == 'x':
-        return (float(px) / slide_width_px) * slide_inches[0]
+        return pixel_transform(slide_width_px, slide_inches[0])(px)
     else:
-        return (float(px) / slide_height_px) * slide_inches[1]
+        return pixel_transform(slide_height_px, slide_inches[1])(px)
 
 def extract_title(node):
     meta = node.find("metadata")
@@ -19,28 +20,52 @@ def extract_title(node):
             return title.text.strip()
     return "Sans titre"
 
+# <node> enfants directs d'un élément (éventuellement sous <nodes>), sans descendre dans les sous-nodes
+def iter_child_nodes(el):
+    for child in el:
+        if child.tag == "node":
+            yield child
+        else:
+            yield from iter_child_nodes(child)
+
+# 🌳 Un seul parcours de l'arbre : chaque node est visité et converti une seule fois.
+# Un node qui contient des nodes ouvre une section ("Parent › Enfant" pour les
+# sections imbriquées, PowerPoint n'ayant qu'un niveau de sections). Chaque node
+# de section donne un seul groupe : une page placée après une sous-section
+# rejoint le groupe de sa section, avant les sous-sections.
 def parse_xml_to_slides(xml_file, media_dir):
     tree = ET.parse(xml_file)
     root = tree.getroot()
     course_structure = []
 
-    for node in root.findall(".//node"):
-        subnodes = node.findall(".//node")
+    # (node, groupe de la section qui le contient ou None)
+    stack = [(node, None) for node in reversed(list(iter_child_nodes(root)))]
+    while stack:
+        node, group = stack.pop()
+        subnodes = list(iter_child_nodes(node))
         if subnodes:
-            section_title = extract_title(node)
+            title = extract_title(node)
+            section_title = title if group is None else f"{group['section']} › {title}"
             section = {"section": section_title, "slides": []}
-            for sub in subnodes:
-                section["slides"].append(extract_slide_data(sub, media_dir))
             course_structure.append(section)
+            own_screen = node.find("page/screen")
+            if own_screen is not None:
+                section["slides"].append(extract_slide_data(node, media_dir, own_screen))
+            stack.extend((sub, section) for sub in reversed(subnodes))
+            continue
+
+        slide = extract_slide_data(node, media_dir)
+        if group is not None:
+            group["slides"].append(slide)
         else:
-            slide = extract_slide_data(node, media_dir)
             course_structure.append({"section": None, "slides": [slide]})
-    
+
     return course_structure
 
-def extract_slide_data(node, media_dir):
+def extract_slide_data(node, media_dir, screen=None):
     slide_data = {'title': extract_title(node), 'texts': [], 'images': []}
-    screen = node.find(".//screen")
+    if screen is None:
+        screen = node.find(".//screen")
     if screen is None:
         return slide_data
 
@@ -62,8 +87,7 @@ def extract_slide_data(node, media_dir):
         content = txt.find("content")
         if content is not None:
             raw_html = content.text or ''
-            soup = BeautifulSoup(raw_html, "html.parser")
-            text = soup.get_text().strip()
+            text = html_to_text(raw_html).strip()
             design = txt.find("design")
             if design is not None:
                 slide_data['texts'].append({